@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+# The solutions import each other as top-level modules (e.g. "from commonlib import ...")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from runner import main  # noqa: E402
+
+if __name__ == "__main__":
+    main()
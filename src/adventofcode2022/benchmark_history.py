@@ -0,0 +1,113 @@
+"""
+Persistent history of the runner's timings, stored as one JSON record per line.
+Used to compare a new run against the stored baseline of each (day, part, input_hash, engine).
+"""
+
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+from typing import Any, Collection
+
+DEFAULT_HISTORY_FILE = "bench_history.jsonl"
+DEFAULT_THRESHOLD = 1.25  # A solution is a regression if it gets 25% slower than its baseline
+DEFAULT_METRIC = "median"
+METRICS = ("min", "median", "p95")
+MIN_SECONDS_COMPARED = 0.001  # Timings below this are too noisy to compare
+
+Key = tuple[int, int, str, str]
+
+
+def record_key(record: dict[str, Any]) -> Key:
+    """
+    Records run with different engines are never compared. Records without an engine use the default one.
+
+    >>> record_key({"day": 20, "part": 2, "input_hash": "ad53e8806d17", "median": 1.5})
+    (20, 2, 'ad53e8806d17', '')
+    >>> record_key({"day": 20, "part": 2, "input_hash": "ad53e8806d17", "engine": "numpy", "median": 0.6})
+    (20, 2, 'ad53e8806d17', 'numpy')
+    """
+    return (record["day"], record["part"], record["input_hash"], record.get("engine", ""))
+
+
+def append_records(path: str | Path, records: list[dict[str, Any]]) -> None:
+    """Appends the records to the history file, stamped with the current time"""
+    timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps({"timestamp": timestamp, **record}, default=str) + "\n")
+
+
+def load_baselines(path: str | Path) -> dict[Key, dict[str, Any]]:
+    """
+    Returns the most recent record of each (day, part, input_hash, engine) in the history file.
+    Failed records have no timings, so they are never baselines.
+    """
+    baselines: dict[Key, dict[str, Any]] = {}
+    if not Path(path).exists():
+        return baselines
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if "error" not in record:
+                    baselines[record_key(record)] = record
+    return baselines
+
+
+def find_regressions(
+    records: list[dict[str, Any]],
+    baselines: dict[Key, dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = DEFAULT_METRIC,
+    parts: Collection[int] = (1, 2),
+) -> list[str]:
+    """
+    Returns a message for every record that failed, is slower than threshold x its baseline,
+    or whose answer differs from the baseline's answer.
+    Also returns one for every baseline of the parts that were run, on a (day, input_hash, engine) that was run,
+    without a current record.
+    Records without a baseline (new days, or different inputs) are only regressions if they failed.
+
+    >>> baselines = {(20, 2, "abc", ""): {"day": 20, "part": 2, "input_hash": "abc", "median": 1.0}}
+    >>> find_regressions([{"day": 20, "part": 2, "input_hash": "abc", "median": 1.2}], baselines)
+    []
+    >>> find_regressions([{"day": 20, "part": 2, "input_hash": "abc", "median": 1.5}], baselines)
+    ['Day 20 Part 2: median 1.500000 s vs baseline 1.000000 s (x1.50 > x1.25)']
+    >>> baselines[(20, 2, "abc", "")]["answer"] = 3
+    >>> find_regressions([{"day": 20, "part": 2, "input_hash": "abc", "median": 1.0, "answer": 4}], baselines)
+    ['Day 20 Part 2: answer 4 vs baseline 3']
+    >>> find_regressions([{"day": 20, "part": 2, "input_hash": "abc", "error": "ValueError: oops"}], baselines)
+    ['Day 20 Part 2: failed, ValueError: oops']
+    >>> find_regressions([{"day": 20, "part": 1, "input_hash": "abc", "median": 9.0}], baselines)
+    ['Day 20 Part 2: no result vs baseline 1.000000 s']
+    >>> find_regressions([{"day": 20, "part": 1, "input_hash": "abc", "median": 9.0}], baselines, parts=[1])
+    []
+    """
+    regressions: list[str] = []
+    run_inputs = {(day, input_hash, engine) for day, _, input_hash, engine in map(record_key, records)}
+    record_keys = {record_key(record) for record in records}
+    for key, missing in baselines.items():
+        day, part, input_hash, engine = key
+        if part in parts and (day, input_hash, engine) in run_inputs and key not in record_keys:
+            regressions.append(f"Day {day:02d} Part {part}: no result vs baseline {missing[metric]:.6f} s")
+    for record in records:
+        if "error" in record:
+            regressions.append(f"Day {record['day']:02d} Part {record['part']}: failed, {record['error']}")
+            continue
+        baseline = baselines.get(record_key(record))
+        if baseline is None:
+            continue
+        if "answer" in baseline and str(record.get("answer")) != str(baseline["answer"]):
+            regressions.append(
+                f"Day {record['day']:02d} Part {record['part']}:"
+                f" answer {record.get('answer')} vs baseline {baseline['answer']}"
+            )
+        if baseline[metric] < MIN_SECONDS_COMPARED:
+            continue
+        ratio = record[metric] / baseline[metric]
+        if ratio > threshold:
+            regressions.append(
+                f"Day {record['day']:02d} Part {record['part']}: {metric} {record[metric]:.6f} s"
+                f" vs baseline {baseline[metric]:.6f} s (x{ratio:.2f} > x{threshold:.2f})"
+            )
+    return regressions
@@ -6,12 +6,20 @@ def read_file_with_blocks_of_int(filename: str) -> List[List[int]]:
     Blocks are separated by an empty line.
     Otherwise expects all lines to have integers.
     """
-    out_list: List[List[int]] = []
     with open(filename) as f:
-        text = f.read()
-        text_blocks = text.split("\n\n")
-        for text_block in text_blocks:
-            out_list.append([int(line) for line in text_block.split("\n")])
+        return parse_blocks_of_int(f.read())
+
+
+def parse_blocks_of_int(text: str) -> List[List[int]]:
+    """Same as read_file_with_blocks_of_int(), but for text that was already read.
+
+    >>> parse_blocks_of_int("1\\n2\\n\\n3\\n")
+    [[1, 2], [3]]
+    """
+    out_list: List[List[int]] = []
+    text_blocks = text.rstrip().split("\n\n")
+    for text_block in text_blocks:
+        out_list.append([int(line) for line in text_block.split("\n")])
     return out_list
 
 
@@ -1,5 +1,6 @@
+from collections import deque
 import doctest
-from typing import List, Tuple
+from typing import Iterable, List, NamedTuple, Tuple
 
 FILE_INPUT = "src/adventofcode2022/day12_input.txt"
 DIRECTIONS = [
@@ -13,12 +14,156 @@ END = "E"
 END_PART_2 = "a"
 HEIGHTS = "SabcdefghijklmnopqrstuvwxyzE"
 
+EXAMPLE_LINES = [  # Used by the doctests
+    "Sabqponm",
+    "abcryxxl",
+    "accszExk",
+    "acctuvwj",
+    "abdefghi",
+]
+UNREACHED = -1
+
 Point = Tuple[int, int]
 Path = List[Point]
 Matrix = List[List[str]]
 Matrix_b = List[List[bool]]
 
 
+class HeightMap:
+    """
+    The map converted once to a flat list of heights. The cell (row, col) is at index row * num_cols + col.
+
+    >>> height_map = HeightMap(EXAMPLE_LINES)
+    >>> height_map.index((2, 5)), height_map.point(21), height_map.cells[21], height_map.heights[21]
+    (21, (2, 5), 'E', 27)
+    >>> height_map.neighbors(0), height_map.neighbors(21, reversed_path=True)
+    ([8, 1], [20])
+    """
+
+    def __init__(self, lines: List[str]) -> None:
+        self.num_rows = len(lines)
+        self.num_cols = len(lines[0])
+        self.cells = "".join(lines)
+        self.heights = [HEIGHTS.index(cell) for cell in self.cells]
+
+    def index(self, p: Point) -> int:
+        return p[0] * self.num_cols + p[1]
+
+    def point(self, i: int) -> Point:
+        row, col = divmod(i, self.num_cols)
+        return (row, col)
+
+    def neighbors(self, i: int, reversed_path: bool = False) -> List[int]:
+        """Returns the cells that can be reached from cell i (or, if reversed_path, that can reach cell i)"""
+        row, col = divmod(i, self.num_cols)
+        candidates = []
+        if row < self.num_rows - 1:
+            candidates.append(i + self.num_cols)
+        if row > 0:
+            candidates.append(i - self.num_cols)
+        if col < self.num_cols - 1:
+            candidates.append(i + 1)
+        if col > 0:
+            candidates.append(i - 1)
+        heights = self.heights
+        if reversed_path:
+            return [n for n in candidates if heights[n] - heights[i] >= -1]
+        return [n for n in candidates if heights[n] - heights[i] <= 1]
+
+
+class Search(NamedTuple):
+    """The result of a breadth-first search: the distance to each cell and the cell before it in the path"""
+
+    distances: List[int]
+    parents: List[int]
+
+    def path(self, i: int) -> List[int]:
+        """Returns the cells of the shortest path to cell i, from the start"""
+        path = [i]
+        while self.parents[path[-1]] != UNREACHED:
+            path.append(self.parents[path[-1]])
+        return path[::-1]
+
+
+def bfs(
+    height_map: HeightMap, starts: Iterable[int], goal_cell: str = "", reversed_path: bool = False
+) -> Tuple[Search, int]:
+    """
+    Breadth-first search from all the starts at once, until it reaches a cell of type goal_cell.
+    Returns the search, and the cell that was reached (UNREACHED if there's none, or if there's no goal_cell).
+
+    >>> height_map = HeightMap(EXAMPLE_LINES)
+    >>> search, goal = bfs(height_map, [0], END)
+    >>> search.distances[goal], "".join(height_map.cells[i] for i in search.path(goal))
+    (31, 'SabcccdefghijklmnopqrstuvwxxxyzE')
+    """
+    distances = [UNREACHED] * len(height_map.heights)
+    parents = [UNREACHED] * len(height_map.heights)
+    queue = deque(starts)
+    for start in queue:
+        distances[start] = 0
+    while queue:
+        i = queue.popleft()
+        if height_map.cells[i] == goal_cell:
+            return Search(distances, parents), i
+        for n in height_map.neighbors(i, reversed_path):
+            if distances[n] == UNREACHED:
+                distances[n] = distances[i] + 1
+                parents[n] = i
+                queue.append(n)
+    return Search(distances, parents), UNREACHED
+
+
+def distance_field(height_map: HeightMap, cells: Iterable[int], to_cells: bool = False) -> Search:
+    """
+    Returns the distances from the nearest of the cells to every cell of the map, in a single search.
+    With to_cells, they are the distances from every cell of the map to the nearest of the cells instead,
+    and the parents point to the next step towards them.
+
+    >>> height_map = HeightMap(EXAMPLE_LINES)
+    >>> field = distance_field(height_map, [height_map.cells.index(END)], to_cells=True)
+    >>> field.distances[height_map.cells.index(START)], min(field.distances[i] for i in cells_of(height_map, "a"))
+    (31, 29)
+    >>> field.distances[:8]
+    [31, 30, 29, 12, 13, 14, 15, 16]
+    """
+    return bfs(height_map, cells, reversed_path=to_cells)[0]
+
+
+def cells_of(height_map: HeightMap, cell: str) -> List[int]:
+    """Returns the indexes of all the cells of the given type"""
+    return [i for i, c in enumerate(height_map.cells) if c == cell]
+
+
+def nearest_cells(field: Search, cells: Iterable[int], k: int) -> List[Tuple[int, int]]:
+    """
+    Returns the k (distance, cell) pairs of the cells that are nearest in the field, ignoring unreachable cells
+
+    >>> height_map = HeightMap(EXAMPLE_LINES)
+    >>> field = distance_field(height_map, [height_map.cells.index(END)], to_cells=True)
+    >>> [(d, height_map.point(i)) for d, i in nearest_cells(field, cells_of(height_map, "a"), 3)]
+    [(29, (4, 0)), (30, (0, 1)), (30, (1, 0))]
+    """
+    return sorted((field.distances[i], i) for i in cells if field.distances[i] != UNREACHED)[:k]
+
+
+def best_path_length_bfs(lines: List[str], part_1: bool) -> int:
+    """
+    Same as best_path_length(), with the HeightMap and a single search that doesn't copy paths.
+
+    >>> best_path_length_bfs(EXAMPLE_LINES, part_1=True)
+    31
+    >>> best_path_length_bfs(EXAMPLE_LINES, part_1=False)
+    29
+    """
+    height_map = HeightMap(lines)
+    start = height_map.cells.index(START if part_1 else END)
+    search, goal = bfs(height_map, [start], END if part_1 else END_PART_2, reversed_path=not part_1)
+    if goal == UNREACHED:
+        raise ValueError("There are no solutions!")
+    return search.distances[goal]
+
+
 def get_neighbors(p: Point, matrix: Matrix, reversed_path: bool = False) -> List[Point]:
     neighbors: List[Point] = []
     num_rows = len(matrix)
@@ -56,16 +201,9 @@ def get_next_possible_paths(path: Path, matrix: Matrix, visited: Matrix_b, part_
 
 def best_path_length(lines: List[str], part_1: bool) -> int:
     """
-    >>> lines = [
-    ...     "Sabqponm",
-    ...     "abcryxxl",
-    ...     "accszExk",
-    ...     "acctuvwj",
-    ...     "abdefghi",
-    ... ]
-    >>> best_path_length(lines, part_1=True)
+    >>> best_path_length(EXAMPLE_LINES, part_1=True)
     31
-    >>> best_path_length(lines, part_1=False)
+    >>> best_path_length(EXAMPLE_LINES, part_1=False)
     29
     """
     matrix: Matrix = [list(line) for line in lines]
@@ -111,6 +249,6 @@ if __name__ == "__main__":
     with open(FILE_INPUT) as f:
         lines = f.read().rstrip().split("\n")
 
-    print(best_path_length(lines, part_1=True))
-    print(best_path_length(lines, part_1=False))
+    print(best_path_length_bfs(lines, part_1=True))
+    print(best_path_length_bfs(lines, part_1=False))
     exit()
@@ -73,22 +73,27 @@ def compare(packet1: Packet, packet2: Packet) -> Optional[bool]:
     assert False
 
 
-if __name__ == "__main__":
-    assert not doctest.testmod().failed
-
-    # with open(FILE_INPUT_EX) as f:
-    with open(FILE_INPUT) as f:
-        blocks = f.read().rstrip().split("\n\n")
-
-    # Part 1
+def sum_right_order_indexes(blocks: List[str]) -> int:
+    """
+    Part 1
+    >>> sum_right_order_indexes(["[1,1,3,1,1]\\n[1,1,5,1,1]", "[9]\\n[[8,7,6]]"])
+    1
+    """
     counter = 0
     packets_txt = [block.split("\n") for block in blocks]
     for i, (packet1_txt, packet2_txt) in enumerate(packets_txt):
         if compare(eval(packet1_txt), eval(packet2_txt)):
             counter += i + 1
-    print(counter)
+    return counter
 
-    # Part 2
+
+def decoder_key(blocks: List[str]) -> int:
+    """
+    Part 2
+    >>> decoder_key(["[1,1,3,1,1]\\n[1,1,5,1,1]", "[9]\\n[[8,7,6]]"])
+    12
+    """
+    packets_txt = [block.split("\n") for block in blocks]
     packets = [PacketObj(key) for key in DIVIDER_PACKETS]
     for packet1_txt, packet2_txt in packets_txt:
         packets.append(PacketObj(eval(packet1_txt)))
@@ -99,8 +104,19 @@ if __name__ == "__main__":
 
     # Calculate decoder key
     packets_values = [packet.value for packet in sorted_packets]
-    decoder_key = 1
+    key_product = 1
     for key in DIVIDER_PACKETS:
-        decoder_key *= packets_values.index(key) + 1
-    print(decoder_key)
+        key_product *= packets_values.index(key) + 1
+    return key_product
+
+
+if __name__ == "__main__":
+    assert not doctest.testmod().failed
+
+    # with open(FILE_INPUT_EX) as f:
+    with open(FILE_INPUT) as f:
+        blocks = f.read().rstrip().split("\n\n")
+
+    print(sum_right_order_indexes(blocks))
+    print(decoder_key(blocks))
     exit()
@@ -10,6 +10,13 @@ class P(NamedTuple):
 FILE_INPUT = "src/adventofcode2022/day14_input.txt"
 HOLE = P(500, 0)
 DIRECTIONS = [P(0, 1), P(-1, 1), P(1, 1)]
+EXAMPLE_ROCK_LINES = [  # Used by the doctests
+    [P(x=498, y=4), P(x=498, y=6), P(x=496, y=6)],
+    [P(x=503, y=4), P(x=502, y=4), P(x=502, y=9), P(x=494, y=9)],
+]
+EMPTY = 0
+ROCK = 1
+SAND = 2
 
 
 def parse_rock_lines(lines: List[str]) -> List[List[P]]:
@@ -136,6 +143,79 @@ def drop_sand_2(cave: Dict[P, str], hole: P) -> int:
     return num_sand_units
 
 
+def drop_sand_grid(rock_lines: List[List[P]], hole: P, with_floor: bool) -> int:
+    """
+    Same as drop_sand_1() (or drop_sand_2() if with_floor), with the cave in a flat bytearray:
+    the cell (x, y) is at index y * width + x - x_min.
+    The path of the falling sand is kept in a stack. When a sand unit stops, the previous position in its path
+    is exactly where the next sand unit would be after falling from the hole, so it starts from there.
+
+    >>> drop_sand_grid(EXAMPLE_ROCK_LINES, HOLE, with_floor=False)
+    24
+    >>> drop_sand_grid(EXAMPLE_ROCK_LINES, HOLE, with_floor=True)
+    93
+    """
+    rocks = build_cave(rock_lines)
+    y_lowest_rock = max(p.y for p in rocks)
+    y_floor = y_lowest_rock + 2
+    # The sand can't spread further than the distance to the floor. There's 1 extra column on each side
+    x_min = min(min(p.x for p in rocks), hole.x - y_floor) - 1
+    x_max = max(max(p.x for p in rocks), hole.x + y_floor) + 1
+    width = x_max - x_min + 1
+    grid = bytearray(width * (y_floor + 1))
+    for p in rocks:
+        grid[p.y * width + p.x - x_min] = ROCK
+    if with_floor:
+        grid[y_floor * width :] = bytes([ROCK]) * width
+    # Without floor, reaching the row of the lowest rock means falling forever
+    i_abyss = len(grid) if with_floor else y_lowest_rock * width
+
+    num_sand_units = 0
+    path = [hole.y * width + hole.x - x_min]
+    while path:
+        i = path[-1]
+        for i_next in (i + width, i + width - 1, i + width + 1):
+            if grid[i_next] == EMPTY:
+                if i_next >= i_abyss:
+                    return num_sand_units
+                path.append(i_next)
+                break
+        else:
+            # Sand stops here
+            grid[i] = SAND
+            num_sand_units += 1
+            path.pop()
+    # The hole is covered
+    return num_sand_units
+
+
+def count_sand_2_rows(rock_lines: List[List[P]], hole: P) -> int:
+    """
+    Same as drop_sand_2(), without simulating the sand units.
+    With the floor, the sand fills every cell it can reach: a cell gets sand if any of the 3 cells above it has sand,
+    and it isn't rock. That's a triangle under the hole, minus the rocks and the shadows they cast.
+    Each row of the triangle is an int bitmask, with bit 0 at the leftmost column the sand can reach.
+
+    >>> count_sand_2_rows(EXAMPLE_ROCK_LINES, HOLE)
+    93
+    """
+    rocks = build_cave(rock_lines)
+    y_floor = max(p.y for p in rocks) + 2
+    x_left = hole.x - y_floor
+    rock_rows = [0] * y_floor
+    for p in rocks:
+        if 0 <= p.x - x_left <= 2 * y_floor:
+            rock_rows[p.y] |= 1 << (p.x - x_left)
+
+    num_sand_units = 0
+    row = 1 << (hole.x - x_left)
+    for y in range(hole.y, y_floor):
+        if y > hole.y:
+            row = (row | row << 1 | row >> 1) & ~rock_rows[y]
+        num_sand_units += bin(row).count("1")
+    return num_sand_units
+
+
 if __name__ == "__main__":
     assert not doctest.testmod().failed
 
@@ -143,8 +223,7 @@ if __name__ == "__main__":
         lines = f.read().rstrip().split("\n")
 
     rock_lines = parse_rock_lines(lines)
-    cave = build_cave(rock_lines)
-    print(drop_sand_1(cave, HOLE))
-    cave = build_cave(rock_lines)
-    print(drop_sand_2(cave, HOLE))
+    # With drop_sand_1() and drop_sand_2(), Part 2 took 5 seconds
+    print(drop_sand_grid(rock_lines, HOLE, with_floor=False))
+    print(count_sand_2_rows(rock_lines, HOLE))
     exit()
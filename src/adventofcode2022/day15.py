@@ -3,6 +3,8 @@ from functools import lru_cache
 import re
 from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
 
+import numpy as np
+
 
 class P(NamedTuple):
     x: int
@@ -21,6 +23,9 @@ DEMO_MAX_XY = 20
 MIN_XY = 0
 MAX_XY = 4_000_000
 TUNING_FACTOR = 4_000_000
+# Multiple rows
+ROWS_PER_CHUNK = 100_000  # Rows computed at once by count_covered_rows(), to limit the memory of the arrays
+EMPTY_INTERVAL_X = -(2**40)  # Far to the left of any sensor
 
 
 def print_plot(t: Dict[Tuple[int, int], str], tick: int = 10) -> None:
@@ -130,24 +135,247 @@ def get_neighborhood_edge(p: P, distance: int) -> Iterable[P]:
     yield P(p.x + distance, p.y)
 
 
+def parse_closest_pairs(lines: List[str]) -> List[Tuple[P, P]]:
+    """
+    >>> parse_closest_pairs(["Sensor at x=2, y=18: closest beacon is at x=-2, y=15"])
+    [(P(x=2, y=18), P(x=-2, y=15))]
+    """
+    closest_pairs: List[Tuple[P, P]] = []
+    for line in lines:
+        r = re.search(r"x=(-?\d+).*y=(-?\d+).*x=(-?\d+).*y=(-?\d+)", line)
+        assert r is not None
+        sx, sy, bx, by = map(int, r.groups())
+        closest_pairs.append((P(sx, sy), P(bx, by)))
+    return closest_pairs
+
+
+def count_no_beacon_points(closest_pairs: List[Tuple[P, P]], y: int) -> int:
+    """
+    Part 1: Smart approach
+
+    >>> count_no_beacon_points([(P(8, 7), P(2, 10))], 10)
+    12
+    """
+    no_beacon_points: Set[P] = set()
+    for sensor, beacon in closest_pairs:
+        distance = get_distance(sensor, beacon)
+        no_beacon_points.update(get_neighbors_with_given_y(sensor, distance, y))
+    # We need to remove potencial beacons that intersect with the no_beacon_points
+    for _, beacon in closest_pairs:
+        no_beacon_points.discard(beacon)
+    return len(no_beacon_points)
+
+
+def covered_intervals(closest_pairs: List[Tuple[P, P]], y: int) -> List[Tuple[int, int]]:
+    """
+    Returns the x intervals (inclusive) of the line y that are inside any sensor's neighborhood.
+    The intervals are sorted and merged, so they don't overlap nor touch each other.
+
+    >>> covered_intervals([(P(8, 7), P(2, 10)), (P(0, 11), P(2, 10)), (P(20, 10), P(21, 10))], 10)
+    [(-2, 14), (19, 21)]
+    """
+    intervals: List[Tuple[int, int]] = []
+    for sensor, beacon in closest_pairs:
+        # Distance that the neighborhood extends to each side, on the line y
+        half_width = get_distance(sensor, beacon) - abs(sensor.y - y)
+        if half_width >= 0:
+            intervals.append((sensor.x - half_width, sensor.x + half_width))
+    return merge_intervals(intervals)
+
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Sorts and merges the inclusive intervals, so they don't overlap nor touch each other
+
+    >>> merge_intervals([(5, 8), (0, 2), (3, 4), (10, 12), (11, 11)])
+    [(0, 8), (10, 12)]
+    """
+    merged: List[Tuple[int, int]] = []
+    for low, high in sorted(intervals):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def uncovered_ranges(covered: List[Tuple[int, int]], low: int, high: int) -> List[Tuple[int, int]]:
+    """
+    The parts of [low, high] outside the merged intervals of covered
+
+    >>> uncovered_ranges([(-5, 2), (5, 6), (9, 20)], 0, 10)
+    [(3, 4), (7, 8)]
+    """
+    ranges: List[Tuple[int, int]] = []
+    for covered_low, covered_high in covered:
+        if covered_low > low:
+            ranges.append((low, min(covered_low - 1, high)))
+        low = max(low, covered_high + 1)
+        if low > high:
+            return ranges
+    ranges.append((low, high))
+    return ranges
+
+
+def count_no_beacon_points_intervals(closest_pairs: List[Tuple[P, P]], y: int) -> int:
+    """
+    Part 1 with the merged intervals of the line, instead of a set with every point.
+
+    >>> count_no_beacon_points_intervals([(P(8, 7), P(2, 10))], 10)
+    12
+    """
+    intervals = covered_intervals(closest_pairs, y)
+    num_points = sum(x_high - x_low + 1 for x_low, x_high in intervals)
+    # We need to remove the beacons that are in the line (each beacon is inside an interval)
+    beacons_in_line = {beacon for _, beacon in closest_pairs if beacon.y == y}
+    return num_points - len(beacons_in_line)
+
+
+def closest_pairs_arrays(closest_pairs: List[Tuple[P, P]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the sensors and the beacons as arrays with a row (x, y) for each pair
+
+    >>> sensors, beacons = closest_pairs_arrays([(P(8, 7), P(2, 10)), (P(0, 11), P(2, 10))])
+    >>> sensors.tolist(), beacons.tolist()
+    ([[8, 7], [0, 11]], [[2, 10], [2, 10]])
+    """
+    sensors = np.array([sensor for sensor, _ in closest_pairs], dtype=np.int64).reshape(-1, 2)
+    beacons = np.array([beacon for _, beacon in closest_pairs], dtype=np.int64).reshape(-1, 2)
+    return sensors, beacons
+
+
+def count_covered_rows(
+    sensors: np.ndarray, beacons: np.ndarray, y_low: int, y_high: int, exclude_beacons: bool = True
+) -> np.ndarray:
+    """
+    Returns the number of points inside any sensor's neighborhood for each line from y_low to y_high (inclusive).
+    With exclude_beacons, the beacons are not counted, like in count_no_beacon_points_intervals().
+    The intervals of all (line, sensor) pairs are computed at once. On each line, after sorting them,
+    an interval only adds the points to the right of every interval before it.
+
+    >>> closest_pairs = [(P(8, 7), P(2, 10)), (P(0, 11), P(2, 10)), (P(20, 10), P(21, 10))]
+    >>> count_covered_rows(*closest_pairs_arrays(closest_pairs), 8, 12).tolist()
+    [17, 18, 18, 18, 14]
+    >>> [count_no_beacon_points_intervals(closest_pairs, y) for y in range(8, 13)]
+    [17, 18, 18, 18, 14]
+    """
+    counts = np.zeros(y_high - y_low + 1, dtype=np.int64)
+    distances = np.abs(sensors - beacons).sum(axis=1)
+    for chunk_low in range(y_low, y_high + 1, ROWS_PER_CHUNK):
+        ys = np.arange(chunk_low, min(chunk_low + ROWS_PER_CHUNK, y_high + 1), dtype=np.int64)
+        # One interval per (line, sensor). The empty ones are moved far to the left, with no points
+        half_widths = distances - np.abs(sensors[:, 1] - ys[:, np.newaxis])
+        is_empty = half_widths < 0
+        x_lows = np.where(is_empty, EMPTY_INTERVAL_X, sensors[:, 0] - half_widths)
+        x_highs = np.where(is_empty, EMPTY_INTERVAL_X - 1, sensors[:, 0] + half_widths)
+        order = np.argsort(x_lows, axis=1)
+        x_lows = np.take_along_axis(x_lows, order, axis=1)
+        x_highs = np.take_along_axis(x_highs, order, axis=1)
+        # The rightmost point covered by the intervals before each one
+        previous_highs = np.maximum.accumulate(x_highs, axis=1)
+        previous_highs = np.concatenate([np.full((len(ys), 1), EMPTY_INTERVAL_X), previous_highs[:, :-1]], axis=1)
+        new_points = x_highs - np.maximum(x_lows - 1, previous_highs)
+        counts[chunk_low - y_low : chunk_low - y_low + len(ys)] = np.maximum(new_points, 0).sum(axis=1)
+    if exclude_beacons:
+        # Each beacon is inside its sensor's neighborhood, so it was counted
+        unique_beacons = np.unique(beacons, axis=0)
+        beacon_ys = unique_beacons[(y_low <= unique_beacons[:, 1]) & (unique_beacons[:, 1] <= y_high), 1]
+        counts -= np.bincount(beacon_ys - y_low, minlength=len(counts))
+    return counts
+
+
+def find_potential_beacons(closest_pairs: List[Tuple[P, P]], max_xy: int) -> Set[P]:
+    """
+    Part 2
+
+    >>> find_potential_beacons([(P(1, 1), P(1, 2)), (P(0, 0), P(0, 1)), (P(2, 2), P(2, 1)), (P(0, 2), P(0, 1))], 2)
+    {P(x=2, y=0)}
+    """
+    potential_beacons: Set[P] = set()
+    for sensor, beacon in closest_pairs:
+        distance = get_distance(sensor, beacon)
+        # Check all points that are just outside the neighborhood
+        for p in get_neighborhood_edge(sensor, distance + 1):
+            is_point_invalid = False
+            # Check if port falls into boundaries
+            if not (MIN_XY <= p.x <= max_xy and MIN_XY <= p.y <= max_xy):
+                continue
+            # Check point distance to other sensors to verify if it can be a beacon
+            for s, b in closest_pairs:
+                # Invalidate point if it falls in any sensor's neighborhood
+                if get_distance(p, s) <= get_distance(s, b):
+                    is_point_invalid = True
+                    break
+            if not is_point_invalid:
+                # Point is a potential beacon
+                potential_beacons.add(p)
+                if EXIT_ON_1ST_SOLUTION_FOUND:
+                    return potential_beacons
+    return potential_beacons
+
+
+def find_uncovered_points(closest_pairs: List[Tuple[P, P]], max_xy: int) -> Set[P]:
+    """
+    Part 2 with rotated coordinates u = x + y and v = x - y, where each sensor's neighborhood is a square
+    and the points just outside it are on 2 lines of constant u and 2 lines of constant v.
+    An uncovered point next to a covered point is just outside that sensor's neighborhood, so it's on one of those
+    lines. Along each line, the sensors' coverage is a set of v (or u) intervals, merged like in covered_intervals(),
+    and the points in the gaps are uncovered. The edges of the search area are checked the same way.
+    So every uncovered point that is next to a covered point, or on the edge of the search area, is returned:
+    all of them if they are isolated, or the border of the regions they form (and the points of the lines that
+    cross those regions).
+
+    >>> find_uncovered_points([(P(1, 1), P(1, 2)), (P(0, 0), P(0, 1)), (P(2, 2), P(2, 1)), (P(0, 2), P(0, 1))], 2)
+    {P(x=2, y=0)}
+    >>> find_uncovered_points([(P(8, 7), P(2, 10))], 20) >= {P(x=0, y=0), P(x=20, y=20), P(x=8, y=17)}
+    True
+
+    A gap 1 point wide along a diagonal, with ends that aren't crossings of the lines:
+    >>> sorted(find_uncovered_points([
+    ...     (P(4, 6), P(3, 4)), (P(23, 22), P(18, 27)), (P(13, -1), P(19, 5)), (P(3, 18), P(8, 12)),
+    ...     (P(4, 18), P(4, 13)), (P(1, 3), P(-2, 10)), (P(5, 5), P(-3, 4)), (P(16, 15), P(12, 9)),
+    ... ], 18))
+    [P(x=9, y=11), P(x=10, y=10)]
+    """
+    sensors = [
+        (sensor.x + sensor.y, sensor.x - sensor.y, get_distance(sensor, beacon)) for sensor, beacon in closest_pairs
+    ]
+    uncovered: Set[P] = set()
+    for u in {u_sensor + side * (distance + 1) for u_sensor, _, distance in sensors for side in (-1, 1)}:
+        # The v of the points of the line u inside the search area, with the same parity as u
+        v_low = max(2 * MIN_XY - u, u - 2 * max_xy)
+        v_high = min(2 * max_xy - u, u - 2 * MIN_XY)
+        covered = merge_intervals([(v - d, v + d) for u_sensor, v, d in sensors if abs(u - u_sensor) <= d])
+        for low, high in uncovered_ranges(covered, v_low, v_high):
+            uncovered.update(P((u + v) // 2, (u - v) // 2) for v in range(low + (low - u) % 2, high + 1, 2))
+    for v in {v_sensor + side * (distance + 1) for _, v_sensor, distance in sensors for side in (-1, 1)}:
+        u_low = max(2 * MIN_XY - v, 2 * MIN_XY + v)
+        u_high = min(2 * max_xy - v, 2 * max_xy + v)
+        covered = merge_intervals([(u - d, u + d) for u, v_sensor, d in sensors if abs(v - v_sensor) <= d])
+        for low, high in uncovered_ranges(covered, u_low, u_high):
+            uncovered.update(P((u + v) // 2, (u - v) // 2) for u in range(low + (low - v) % 2, high + 1, 2))
+    # The edges of the search area, as rows, and as columns (the rows of the transposed sensors and beacons)
+    transposed = [(P(sensor.y, sensor.x), P(beacon.y, beacon.x)) for sensor, beacon in closest_pairs]
+    for edge in (MIN_XY, max_xy):
+        for x_low, x_high in uncovered_ranges(covered_intervals(closest_pairs, edge), MIN_XY, max_xy):
+            uncovered.update(P(x, edge) for x in range(x_low, x_high + 1))
+        for y_low, y_high in uncovered_ranges(covered_intervals(transposed, edge), MIN_XY, max_xy):
+            uncovered.update(P(edge, y) for y in range(y_low, y_high + 1))
+    return uncovered
+
+
 if __name__ == "__main__":
     assert not doctest.testmod().failed
 
     # The tunnels dict is only used in the brute force approach (DEMO=True), and to display the plot
     tunnels: Dict[P, str] = {}
-    closest_pairs: List[Tuple[P, P]] = []
     file_input = FILE_INPUT_EX if DEMO else FILE_INPUT
     with open(file_input) as f:
         lines = f.read().rstrip().split("\n")
-        for line in lines:
-            r = re.search(r"x=(-?\d+).*y=(-?\d+).*x=(-?\d+).*y=(-?\d+)", line)
-            assert r is not None
-            sx, sy, bx, by = map(int, r.groups())
-            sensor = P(sx, sy)
-            beacon = P(bx, by)
-            closest_pairs.append((sensor, beacon))
-            tunnels[sensor] = "S"
-            tunnels[beacon] = "B"
+    closest_pairs = parse_closest_pairs(lines)
+    for sensor, beacon in closest_pairs:
+        tunnels[sensor] = "S"
+        tunnels[beacon] = "B"
 
     # Part 1: Brute force approach
     if DEMO:
@@ -166,43 +394,12 @@ if __name__ == "__main__":
         line_number = DEMO_Y_LINE if DEMO else PART1_Y_LINE
         print(len([p for p, v in tunnels.items() if p.y == line_number and v != "B"]))
 
-    # Part 1: Smart approach
+    # Part 1: Merged intervals approach (the smart approach, count_no_beacon_points(), took 11.6 seconds)
     else:
-        no_beacon_points: Set[P] = set()
-        for sensor, beacon in closest_pairs:
-            distance = get_distance(sensor, beacon)
-            no_beacon_points.update(get_neighbors_with_given_y(sensor, distance, PART1_Y_LINE))
-        # We need to remove potencial beacons that intersect with the no_beacon_points
-        for _, beacon in closest_pairs:
-            no_beacon_points.discard(beacon)
-        print(len(no_beacon_points))
-
-    # Part 2
-    is_solution_found = False
-    potential_beacons: Set[P] = set()
-    max_xy = DEMO_MAX_XY if DEMO else MAX_XY
-    for sensor, beacon in closest_pairs:
-        distance = get_distance(sensor, beacon)
-        # Check all points that are just outside the neighborhood
-        for p in get_neighborhood_edge(sensor, distance + 1):
-            is_point_invalid = False
-            # Check if port falls into boundaries
-            if not (MIN_XY <= p.x <= max_xy and MIN_XY <= p.y <= max_xy):
-                continue
-            # Check point distance to other sensors to verify if it can be a beacon
-            for s, b in closest_pairs:
-                # Invalidate point if it falls in any sensor's neighborhood
-                if get_distance(p, s) <= get_distance(s, b):
-                    is_point_invalid = True
-                    break
-            if not is_point_invalid:
-                # Point is a potential beacon
-                potential_beacons.add(p)
-                if EXIT_ON_1ST_SOLUTION_FOUND:
-                    is_solution_found = True
-                    break
-        if is_solution_found:
-            break
+        print(count_no_beacon_points_intervals(closest_pairs, PART1_Y_LINE))
+
+    # Part 2 (find_potential_beacons() took 1 minute)
+    potential_beacons = find_uncovered_points(closest_pairs, DEMO_MAX_XY if DEMO else MAX_XY)
     print(list(potential_beacons))
     p = list(potential_beacons)[0]  # With this data, only 1 solution exists
     print(TUNING_FACTOR * p.x + p.y)
@@ -1,11 +1,14 @@
 import doctest
 from functools import lru_cache
 from itertools import permutations
-from queue import PriorityQueue
 from timeit import default_timer as timer
-from typing import Dict, List, NamedTuple, Set, Tuple
+from typing import Callable, Dict, List, NamedTuple, Set, Tuple
 import sys
 
+import numpy as np
+
+from graphs import all_pairs_bfs, DistanceMatrix, UNREACHABLE
+
 sys.setrecursionlimit(100_000)
 
 RUN_EXAMPLE = False  # Change this to run with the example input
@@ -14,12 +17,33 @@ FILE_INPUT = "src/adventofcode2022/day16_input.txt"
 TOTAL_MINUTES_PART1 = 30
 TOTAL_MINUTES_PART2 = 26
 STARTING_NODE = "AA"
+EXAMPLE_LINES = [  # Used by the doctests
+    "Valve AA has flow rate=0; tunnels lead to valves BB",
+    "Valve BB has flow rate=13; tunnels lead to valves AA, CC",
+    "Valve CC has flow rate=0; tunnels lead to valves BB, DD",
+    "Valve DD has flow rate=20; tunnel leads to valve CC",
+]
+DISCONNECTED_LINES = [  # CC can't be reached from AA
+    "Valve AA has flow rate=0; tunnel leads to valve BB",
+    "Valve BB has flow rate=1; tunnel leads to valve AA",
+    "Valve CC has flow rate=50; tunnel leads to valve DD",
+    "Valve DD has flow rate=0; tunnel leads to valve CC",
+]
+
+
+class CompressedGraph(NamedTuple):
+    """
+    The graph reduced to the valves that can be opened, numbered from 0 (valve i is bit 1 << i of a bitmask).
+    The starting node is the last row/column of the distances matrix.
+    """
 
+    names: List[str]
+    rates: List[int]
+    distances: List[List[int]]
 
-class PathElement(NamedTuple):
-    cost: int
-    to_node: str
-    path: List[str]
+    @property
+    def start(self) -> int:
+        return len(self.names)
 
 
 # Global Variables
@@ -27,37 +51,7 @@ nodes: Set[str] = set()  # The names of the nodes
 connected_to: Dict[str, List[str]] = {}  # The connections between nodes
 valve_rates: Dict[str, int] = {}  # The rate of each node's valve when open
 openable_valves: Set[str] = set()  # The valves that are closed at the beginning
-best_paths: Dict[str, Dict[str, PathElement]]  # The Dijkstra's algorythm results
-
-
-def dijkstra_cost_1(node: str, connected_to: Dict[str, List[str]]) -> Dict[str, PathElement]:
-    """
-    Implements Dijkstra's algorithm to figure out the shortest paths from 1 node to all other nodes.
-    It assumes that all costs between nodes are 1.
-    """
-    pq: PriorityQueue[PathElement] = PriorityQueue()
-    shortest_paths: Dict[str, PathElement] = {}
-    cost = 1
-
-    # Add itself to the shortest_paths
-    shortest_paths[node] = PathElement(0, node, [])
-    # Initial population of queue
-    for n in connected_to[node]:
-        pq.put(PathElement(cost, n, [n]))
-
-    while not pq.empty():
-        path_element = pq.get()
-        new_node = path_element.to_node
-        # Ignore path if we already have a better path to that node
-        if new_node in shortest_paths:
-            continue
-        # Add node to shortest path
-        shortest_paths[new_node] = path_element
-        # Add node paths to queue
-        for n in connected_to[new_node]:
-            if n not in shortest_paths:
-                pq.put(PathElement(path_element.cost + cost, n, path_element.path.copy() + [n]))
-    return shortest_paths
+shortest_paths: DistanceMatrix[str] = DistanceMatrix([], [], [])  # The distances between all nodes
 
 
 @lru_cache(maxsize=None)
@@ -75,16 +69,17 @@ def dp_part_1(node: str, minutes_left: int, open_valves: Tuple[str, ...]) -> int
     # A) Do nothing until the end
     options.append(minutes_left * rate)
     # B + C) Walk to an unopened valve and open it
-    for next_node, path in best_paths[node].items():
+    for next_node in nodes:
         # Only travel to nodes with unopened valves
         if next_node not in (set(openable_valves) - set(open_valves) - set([node])):
             continue
         # Only go there if there's time to walk, open the valve, and profit from the valve being opened
-        if minutes_left <= path.cost + 1:
+        cost = shortest_paths.distance(node, next_node)
+        if minutes_left <= cost + 1:
             continue
         next_open_valves = tuple(sorted(list(open_valves) + [next_node]))
-        pressure_increase = (path.cost + 1) * rate
-        options.append(dp_part_1(next_node, minutes_left - path.cost - 1, next_open_valves) + pressure_increase)
+        pressure_increase = (cost + 1) * rate
+        options.append(dp_part_1(next_node, minutes_left - cost - 1, next_open_valves) + pressure_increase)
     return max(options)
 
 
@@ -125,23 +120,184 @@ def dp_part_2(
     # A) Do nothing until the end
     options.append(minutes_left * rate + other_players_pressure)
     # B + C) Walk to an unopened valve and open it
-    for next_node, path in best_paths[node].items():
+    for next_node in nodes:
         # Only travel to nodes with unopened valves
         if next_node not in (set(openable_valves) - set(open_valves) - set([node])):
             continue
         # Only go there if there's time to walk, open the valve, and profit from the valve being opened
-        if minutes_left <= path.cost + 1:
+        cost = shortest_paths.distance(node, next_node)
+        if minutes_left <= cost + 1:
             continue
         next_open_valves = tuple(sorted(list(open_valves) + [next_node]))
-        pressure_increase = (path.cost + 1) * rate
+        pressure_increase = (cost + 1) * rate
         options.append(
-            dp_part_2(next_node, minutes_left - path.cost - 1, next_open_valves, openable_valves, num_player)
+            dp_part_2(next_node, minutes_left - cost - 1, next_open_valves, openable_valves, num_player)
             + pressure_increase
         )
 
     return max(options)
 
 
+def compress_graph() -> CompressedGraph:
+    """
+    Builds the CompressedGraph from the global variables (load_valves() must be called first).
+    The valves that can't be reached from the starting node are left out.
+
+    >>> load_valves(EXAMPLE_LINES)
+    >>> compress_graph()
+    CompressedGraph(names=['BB', 'DD'], rates=[13, 20], distances=[[0, 2, 1], [2, 0, 3], [1, 3, 0]])
+    >>> load_valves(DISCONNECTED_LINES)
+    >>> compress_graph()
+    CompressedGraph(names=['BB'], rates=[1], distances=[[0, 1], [1, 0]])
+    """
+    names = sorted(valve for valve in openable_valves if shortest_paths.distance(STARTING_NODE, valve) != UNREACHABLE)
+    rows = names + [STARTING_NODE]
+    return CompressedGraph(names, [valve_rates[name] for name in names], shortest_paths.submatrix(rows))
+
+
+def make_dp_bitmask(graph: CompressedGraph) -> Callable[[int, int, int], int]:
+    """
+    Returns the memoized DP function over the CompressedGraph, with the open valves as a bitmask.
+    The pressure of a valve is counted all at once, when it's opened, so the DP doesn't need the current rate.
+
+    >>> load_valves(EXAMPLE_LINES)
+    >>> graph = compress_graph()
+    >>> make_dp_bitmask(graph)(graph.start, TOTAL_MINUTES_PART1, 0)
+    864
+    >>> load_valves(DISCONNECTED_LINES)
+    >>> graph = compress_graph()
+    >>> make_dp_bitmask(graph)(graph.start, TOTAL_MINUTES_PART1, 0)
+    28
+    >>> best_pressure_two_players(graph, TOTAL_MINUTES_PART2)
+    24
+    """
+    num_valves = len(graph.names)
+    rates = graph.rates
+    distances = graph.distances
+
+    @lru_cache(maxsize=None)
+    def dp_bitmask(node: int, minutes_left: int, open_valves: int) -> int:
+        """Returns the amount of pressure that can still be released, walking from node to unopened valves"""
+        best = 0
+        for next_node in range(num_valves):
+            bit = 1 << next_node
+            if open_valves & bit:
+                continue
+            # Walk to the valve and open it. Only worth it if there's time left to profit from it
+            if distances[node][next_node] == UNREACHABLE:
+                continue
+            minutes_open = minutes_left - distances[node][next_node] - 1
+            if minutes_open <= 0:
+                continue
+            pressure = rates[next_node] * minutes_open + dp_bitmask(next_node, minutes_open, open_valves | bit)
+            best = max(best, pressure)
+        return best
+
+    return dp_bitmask
+
+
+def best_pressure_per_subset(graph: CompressedGraph, minutes_left: int) -> Dict[int, int]:
+    """
+    Returns the best pressure that can be released by opening exactly each subset of the valves (as a bitmask).
+    The states (node, open_valves) are expanded minute by minute, from the first one to the last one,
+    so all the opening sequences that reach the same state at the same minute are merged into the best one.
+    A state that was already expanded with more minutes left and at least as much pressure is skipped.
+
+    >>> load_valves(EXAMPLE_LINES)
+    >>> sorted(best_pressure_per_subset(compress_graph(), TOTAL_MINUTES_PART2).items())
+    [(0, 0), (1, 312), (2, 440), (3, 732)]
+
+    The best of all the subsets is Part 1, the same as make_dp_bitmask() but faster:
+    >>> max(best_pressure_per_subset(compress_graph(), TOTAL_MINUTES_PART1).values())
+    864
+    """
+    num_valves = len(graph.names)
+    rates = graph.rates
+    distances = graph.distances
+    best: Dict[int, int] = {}
+    expanded: Dict[Tuple[int, int], int] = {}  # The best pressure of each state that was expanded
+    # The best pressure of each state (node, open_valves), for each number of minutes left
+    states: List[Dict[Tuple[int, int], int]] = [{} for _ in range(minutes_left + 1)]
+    states[minutes_left][(graph.start, 0)] = 0
+    for minutes in range(minutes_left, 0, -1):
+        for state, pressure in states[minutes].items():
+            if expanded.get(state, -1) >= pressure:
+                continue
+            expanded[state] = pressure
+            node, open_valves = state
+            best[open_valves] = max(best.get(open_valves, 0), pressure)
+            for next_node in range(num_valves):
+                bit = 1 << next_node
+                if open_valves & bit:
+                    continue
+                if distances[node][next_node] == UNREACHABLE:
+                    continue
+                minutes_open = minutes - distances[node][next_node] - 1
+                if minutes_open <= 0:
+                    continue
+                next_state = (next_node, open_valves | bit)
+                next_pressure = pressure + rates[next_node] * minutes_open
+                if states[minutes_open].get(next_state, -1) < next_pressure:
+                    states[minutes_open][next_state] = next_pressure
+        states[minutes].clear()
+    return best
+
+
+def best_pressure_two_players(graph: CompressedGraph, minutes_left: int) -> int:
+    """
+    Part 2, without restarting the 2nd player for every state of the 1st one:
+    the 2 players open disjoint sets of valves, so the answer is the best sum of 2 disjoint subsets.
+    After propagating the best of the subsets of each bitmask (best[mask] >= best[any subset of mask]),
+    only the complement of each bitmask needs to be checked.
+    In the list of bitmasks, the complement of each one is at the mirrored index, so that's best + best[::-1].
+
+    >>> load_valves(EXAMPLE_LINES)
+    >>> best_pressure_two_players(compress_graph(), TOTAL_MINUTES_PART2)
+    752
+    """
+    best = np.zeros(1 << len(graph.names), dtype=np.int64)
+    for open_valves, pressure in best_pressure_per_subset(graph, minutes_left).items():
+        best[open_valves] = pressure
+    for i in range(len(graph.names)):
+        # Views the bitmasks as (higher bits, bit i, lower bits), and propagates from bit i off to bit i on
+        by_bit_i = best.reshape(-1, 2, 1 << i)
+        np.maximum(by_bit_i[:, 1, :], by_bit_i[:, 0, :], out=by_bit_i[:, 1, :])
+    return int((best + best[::-1]).max())
+
+
+def load_valves(lines: List[str]) -> None:
+    """
+    Fills the global variables from the input lines, and calculates the shortest paths between all nodes.
+    The DP caches are cleared, since they depend on the global variables.
+
+    >>> load_valves([
+    ...     "Valve AA has flow rate=0; tunnels lead to valves BB",
+    ...     "Valve BB has flow rate=13; tunnel leads to valve AA",
+    ... ])
+    >>> sorted(openable_valves), compress_graph().distances
+    (['BB'], [[0, 1], [1, 0]])
+    """
+    global shortest_paths
+    nodes.clear()
+    connected_to.clear()
+    valve_rates.clear()
+    openable_valves.clear()
+    dp_part_1.cache_clear()
+    dp_part_2.cache_clear()
+    for line in lines:
+        words = line.split(" ")
+        valve = words[1]
+        rate = int(words[4].split("=")[1][:-1])
+        valves_connected = " ".join(words[9:]).split(", ")
+        # Build variables
+        nodes.add(valve)
+        connected_to[valve] = valves_connected
+        valve_rates[valve] = rate
+        if rate != 0:
+            openable_valves.add(valve)
+    shortest_paths = all_pairs_bfs(connected_to)
+
+
 if __name__ == "__main__":
     assert not doctest.testmod().failed
 
@@ -149,28 +305,17 @@ if __name__ == "__main__":
     file_input = FILE_INPUT_EX if RUN_EXAMPLE else FILE_INPUT
     with open(file_input) as f:
         lines = f.read().rstrip().split("\n")
-        for line in lines:
-            words = line.split(" ")
-            valve = words[1]
-            rate = int(words[4].split("=")[1][:-1])
-            valves_connected = " ".join(words[9:]).split(", ")
-            # Build variables
-            nodes.add(valve)
-            connected_to[valve] = valves_connected
-            valve_rates[valve] = rate
-            if rate != 0:
-                openable_valves.add(valve)
 
     #####
     # Part 1
     #####
 
-    # Step 1: Calculate best paths from all nodes to all nodes
-    best_paths = {node: dijkstra_cost_1(node, connected_to) for node in nodes}
+    # Step 1: Build the variables and calculate best paths from all nodes to all nodes
+    load_valves(lines)
     # Assert
     for i in nodes:
         for j in nodes:
-            assert best_paths[i][j].cost == best_paths[j][i].cost
+            assert shortest_paths.distance(i, j) == shortest_paths.distance(j, i)
 
     # Solution A: Bruteforce (only runs with the example)
     if RUN_EXAMPLE:
@@ -186,7 +331,7 @@ if __name__ == "__main__":
             total_pressure = 0
             for node in opening_sequence:
                 # Walk to node
-                minutes_left -= best_paths[node_cur][node].cost
+                minutes_left -= shortest_paths.distance(node_cur, node)
                 node_cur = node
                 if minutes_left <= 0:
                     break
@@ -205,12 +350,20 @@ if __name__ == "__main__":
     print(dp_part_1(STARTING_NODE, TOTAL_MINUTES_PART1, tuple([])))
     print(f"{timer() - start:4f} seconds")
 
+    # Solution C: Dynamic Programming over the compressed graph, with the open valves in a bitmask
+    print("Solution C: Dynamic Programming with bitmasks")
+    start = timer()
+    graph = compress_graph()
+    print(make_dp_bitmask(graph)(graph.start, TOTAL_MINUTES_PART1, 0))
+    print(f"{timer() - start:4f} seconds")
+
     #####
     # Part 2 - Dynamic Programming (DP)
     #####
-    print("Part 2: Dynamic Programming")
+    # dp_part_2() took 13.5 minutes, and its bitmask version over the compressed graph 12 seconds
+    print("Part 2: Best pressure of each subset of valves")
     start = timer()
-    print(dp_part_2(STARTING_NODE, TOTAL_MINUTES_PART2, tuple([]), tuple(sorted(list(openable_valves))), 2))
+    print(best_pressure_two_players(graph, TOTAL_MINUTES_PART2))
     print(f"{timer() - start:4f} seconds")
 
     exit()
@@ -51,6 +51,209 @@ PIECES = (
     (P(0, 0), P(1, 0), P(0, 1), P(1, 1)),
 )
 
+
+def spawn_rows(piece: tuple[P, ...]) -> tuple[int, ...]:
+    """
+    Returns the rows of a piece at its spawn position, from the bottom up, as 7-bit masks.
+    The leftmost column of the chamber is bit 6, and the rightmost is bit 0.
+
+    >>> [f"{row:07b}" for row in spawn_rows(PIECES[1])]
+    ['0001000', '0011100', '0001000']
+    """
+    rows = [0] * (max(block.y for block in piece) + 1)
+    for block in piece:
+        rows[block.y] |= 1 << (WALL_R - 1 - SPAWN_X - block.x)
+    return tuple(rows)
+
+
+PIECES_ROWS = tuple(spawn_rows(piece) for piece in PIECES)
+LEFT_COLUMN = 1 << (WALL_R - WALL_L - 2)
+RIGHT_COLUMN = 1
+FULL_ROW = (1 << (WALL_R - WALL_L - 1)) - 1
+# With some jet patterns a column stays open down to the floor, so no row is ever unreachable.
+# The rows beyond this are discarded anyway, and a piece that falls down to them is an error
+MAX_KEPT_ROWS = 200
+SURFACE_DEPTH = 30  # Number of rows at the top of the tower that identify a state of the Chamber
+
+
+class Chamber:
+    """
+    The chamber as a list of 7-bit row masks, so a collision is a bitwise AND for each row of the piece.
+    Only the rows that pieces can still reach, and at most max_kept_rows, are kept,
+    so the memory doesn't grow with the number of pieces.
+    If a piece then falls all the way down to the discarded rows, that's a ValueError instead of a wrong height.
+
+    >>> chamber = Chamber(EXAMPLE_TXT)
+    >>> for _ in range(3):
+    ...     chamber.drop()
+    >>> chamber.print_rows()
+    |  #    |
+    |  #    |
+    |####   |
+    |  ###  |
+    |   #   |
+    |  #### |
+
+    Here the 5th piece falls down a shaft past the 8 kept rows:
+    >>> chamber = Chamber("<>>", max_kept_rows=8)
+    >>> for _ in range(5):
+    ...     chamber.drop()
+    Traceback (most recent call last):
+    ...
+    ValueError: Piece 5 fell below the 8 kept rows, raise max_kept_rows
+    """
+
+    def __init__(self, wind: str, max_kept_rows: int = MAX_KEPT_ROWS) -> None:
+        self.jets = [1 if w == ">" else -1 for w in wind]
+        self.jet_index = 0
+        self.rows = bytearray()  # rows[0] is the row right above the floor, or the lowest row that was kept
+        self.num_discarded_rows = 0
+        self.num_pieces = 0
+        self.max_kept_rows = max_kept_rows
+        self.open_below = False  # True when the discarded rows may still be reachable
+
+    @property
+    def height(self) -> int:
+        return self.num_discarded_rows + len(self.rows)
+
+    def collides(self, piece: list[int], y: int) -> bool:
+        """Checks if the piece with its bottom row at y overlaps the rocks"""
+        rows = self.rows
+        for i, piece_row in enumerate(piece, start=y):
+            if i < len(rows) and rows[i] & piece_row:
+                return True
+        return False
+
+    def drop(self) -> None:
+        """Drops the next piece until it comes to rest"""
+        piece = list(PIECES_ROWS[self.num_pieces % len(PIECES_ROWS)])
+        self.num_pieces += 1
+        y = len(self.rows) + SPAWN_Y - 1
+        while True:
+            # Pushed by the jet, if the walls and the rocks allow it
+            jet = self.jets[self.jet_index]
+            self.jet_index = (self.jet_index + 1) % len(self.jets)
+            if jet > 0:
+                if not any(row & RIGHT_COLUMN for row in piece):
+                    moved = [row >> 1 for row in piece]
+                    if not self.collides(moved, y):
+                        piece = moved
+            elif not any(row & LEFT_COLUMN for row in piece):
+                moved = [row << 1 for row in piece]
+                if not self.collides(moved, y):
+                    piece = moved
+            # Falls 1 unit, or comes to rest
+            if y == 0 and self.open_below:
+                raise ValueError(
+                    f"Piece {self.num_pieces} fell below the {self.max_kept_rows} kept rows, raise max_kept_rows"
+                )
+            if y == 0 or self.collides(piece, y - 1):
+                break
+            y -= 1
+        # Add the piece to the rocks
+        for i, piece_row in enumerate(piece, start=y):
+            if i == len(self.rows):
+                self.rows.append(piece_row)
+            else:
+                self.rows[i] |= piece_row
+        self.discard_unreachable_rows()
+        if len(self.rows) > self.max_kept_rows:
+            self.discard_rows(len(self.rows) - self.max_kept_rows)
+            self.open_below = True
+
+    def discard_rows(self, num_rows: int) -> None:
+        """Discards the lowest rows, keeping count of them for the height"""
+        del self.rows[:num_rows]
+        self.num_discarded_rows += num_rows
+
+    def discard_unreachable_rows(self) -> None:
+        """
+        Flood fills the air from the top of the tower. Pieces only move left, right and down,
+        so it's a single pass down the rows, spreading sideways through the free cells of each row.
+        The rows below the one under the deepest reachable cell can never be touched again.
+
+        >>> chamber = Chamber(EXAMPLE_TXT)
+        >>> chamber.rows = bytearray([0b0000001, 0b1111110, 0b0111111, 0b0000001])
+        >>> chamber.discard_unreachable_rows()
+        >>> chamber.num_discarded_rows, chamber.height
+        (1, 4)
+        """
+        reachable = FULL_ROW
+        for i in range(len(self.rows) - 1, -1, -1):
+            free = ~self.rows[i] & FULL_ROW
+            reachable &= free
+            while reachable:
+                spread = (reachable | reachable << 1 | reachable >> 1) & free
+                if spread == reachable:
+                    break
+                reachable = spread
+            if not reachable:
+                # Row i is the lowest row that a piece can still hit
+                self.discard_rows(i)
+                self.open_below = False
+                return
+
+    def print_rows(self) -> None:
+        for row in reversed(self.rows):
+            print("|" + "".join("#" if row & (1 << bit) else " " for bit in range(6, -1, -1)) + "|")
+
+
+def tower_height(wind: str, num_pieces: int) -> int:
+    """
+    Part 1 with the Chamber of bit-packed rows
+
+    >>> tower_height(EXAMPLE_TXT, NUM_PIECES_1)
+    3068
+    """
+    chamber = Chamber(wind)
+    for _ in range(num_pieces):
+        chamber.drop()
+    return chamber.height
+
+
+def tower_height_with_cycles(wind: str, num_pieces: int, depth: int | None = SURFACE_DEPTH) -> int:
+    """
+    Part 2: After each piece, the state of the Chamber is (next piece, next jet, top depth rows).
+    With depth=None all the kept rows are used. That's exact when the unreachable rows get discarded,
+    but with a column open down to the floor the kept rows only repeat after max_kept_rows, which takes much longer.
+    As soon as a state repeats, the pieces in between form a cycle that adds the same height every time,
+    so the remaining cycles are added at once, and the leftover pieces use the heights of the 1st cycle.
+
+    >>> tower_height_with_cycles(EXAMPLE_TXT, NUM_PIECES_1)
+    3068
+    >>> tower_height_with_cycles(EXAMPLE_TXT, NUM_PIECES_2)
+    1514285714288
+
+    With jets that always push to the same side, a column stays open down to the floor:
+    >>> tower_height_with_cycles("<", NUM_PIECES_1) == tower_height("<", NUM_PIECES_1)
+    True
+    >>> tower_height_with_cycles(">><>>", NUM_PIECES_1) == tower_height(">><>>", NUM_PIECES_1)
+    True
+    >>> tower_height_with_cycles("<", NUM_PIECES_2)
+    2200000000000
+    """
+    chamber = Chamber(wind)
+    heights = [0]  # heights[n] is the height after n pieces
+    seen: dict[tuple[int, int, bytes], int] = {}  # The number of pieces when each state was seen
+    while chamber.num_pieces < num_pieces:
+        chamber.drop()
+        heights.append(chamber.height)
+        state = (
+            chamber.num_pieces % len(PIECES_ROWS),
+            chamber.jet_index,
+            bytes(chamber.rows[-depth if depth else 0 :]),
+        )
+        if state in seen:
+            cycle_start = seen[state]
+            cycle_length = chamber.num_pieces - cycle_start
+            cycle_height = chamber.height - heights[cycle_start]
+            num_cycles, num_leftover = divmod(num_pieces - chamber.num_pieces, cycle_length)
+            leftover_height = heights[cycle_start + num_leftover] - heights[cycle_start]
+            return chamber.height + num_cycles * cycle_height + leftover_height
+        seen[state] = chamber.num_pieces
+    return chamber.height
+
+
 # Global variables
 rocks: deque[P] = deque(maxlen=100)
 highest_rock = FLOOR
@@ -243,10 +446,12 @@ if __name__ == "__main__":
             start = timer()
             if part == 1:
                 print("- Part 1:")
-                print(part1(EXAMPLE_TXT if run_example else wind))
+                # part1() took 3.2 seconds
+                print(tower_height(EXAMPLE_TXT if run_example else wind, NUM_PIECES_1))
             else:
                 print("- Part 2:")
-                print(part2(EXAMPLE_TXT if run_example else wind))
+                # part2() took 0.8 seconds, and its answer was 15 too high with the problem input
+                print(tower_height_with_cycles(EXAMPLE_TXT if run_example else wind, NUM_PIECES_2))
             print(f"{timer() - start:4f} seconds")
             print()
     exit()
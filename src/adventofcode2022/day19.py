@@ -1,7 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
 import doctest
 from functools import lru_cache
+import os
 import re
 import sys
+from timeit import default_timer as timer
 from typing import Callable
 
 sys.setrecursionlimit(100_000)
@@ -12,6 +15,7 @@ FILE_INPUT = "src/adventofcode2022/day19_input.txt"
 TOTAL_MINUTES_PART1 = 24
 TOTAL_MINUTES_PART2 = 32
 NUM_BLUEPRINTS_PART2 = 3
+MAX_WORKERS = 8  # Most processes that solve_blueprints() starts, even with more CPUs
 INITIAL_ROBOTS = (1, 0, 0, 0)
 RESOURCE_INDEX = {
     "ore": 0,
@@ -137,6 +141,105 @@ def make_dp_turn(blueprint: dict[str, Amount]) -> Callable[[int, Amount, Amount]
     return dp_turn
 
 
+def max_geodes(blueprint: dict[str, Amount], minutes_left: int) -> int:
+    """Branch and bound search of the maximum number of geodes, starting with INITIAL_ROBOTS and no resources.
+    Like dp_turn(), each step jumps to the minute when the next robot gets built. But there's no cache:
+    - Branches are cut if even an optimistic result (see below) can't beat the best result found so far
+    - Resources are capped to what can still be spent, so equivalent states collapse in the seen set
+
+    >>> blueprint1 = {'ore': (4, 0, 0, 0), 'clay': (2, 0, 0, 0), 'obsidian': (3, 14, 0, 0), 'geode': (2, 0, 7, 0)}
+    >>> blueprint2 = {'ore': (2, 0, 0, 0), 'clay': (3, 0, 0, 0), 'obsidian': (3, 8, 0, 0), 'geode': (3, 0, 12, 0)}
+    >>> max_geodes(blueprint1, 24), max_geodes(blueprint2, 24)
+    (9, 12)
+    >>> max_geodes(blueprint1, 32), max_geodes(blueprint2, 32)
+    (56, 62)
+    """
+    robot_costs = [blueprint[robot_resource] for robot_resource in RESOURCE_INDEX]
+    # There's no use for more robots (or resources) than what can be spent per minute. Geodes are never spent
+    max_resource_needed_per_min = [max(costs[i] for costs in robot_costs) for i in range(3)]
+    best = 0
+    seen: set[tuple[int, Amount, tuple[int, ...]]] = set()
+
+    def upper_bound(minutes_left: int, robots: Amount, resources: Amount) -> int:
+        """Number of geodes if ore and clay were free, and 1 obsidian and 1 geode robot could be built per minute"""
+        obsidian, obsidian_robots, geodes, geode_robots = resources[2], robots[2], resources[3], robots[3]
+        for _ in range(minutes_left):
+            geodes += geode_robots
+            if obsidian >= robot_costs[3][2]:
+                obsidian -= robot_costs[3][2]
+                geode_robots += 1
+            obsidian += obsidian_robots
+            obsidian_robots += 1
+        return geodes
+
+    def search(minutes_left: int, robots: Amount, resources: Amount) -> None:
+        nonlocal best
+        # Option A: Build nothing until the end
+        num_geodes = resources[3] + robots[3] * minutes_left
+        best = max(best, num_geodes)
+        if upper_bound(minutes_left, robots, resources) <= best:
+            return
+        # Cap the resources: at most 1 robot is built per minute, so only max_needed x minutes can be spent
+        capped = tuple(min(resources[i], max_resource_needed_per_min[i] * minutes_left) for i in range(3))
+        state = (minutes_left, robots, capped + (resources[3],))
+        if state in seen:
+            return
+        seen.add(state)
+
+        # Option B: Build a robot of each resource type. Start with geode, to find good results early
+        for index in reversed(range(4)):
+            if index < 3 and robots[index] >= max_resource_needed_per_min[index]:
+                continue
+            robot_cost = robot_costs[index]
+            waiting_minutes = 0
+            for i in range(3):
+                if robot_cost[i] > resources[i]:
+                    if not robots[i]:
+                        break
+                    waiting_minutes = max(waiting_minutes, -((resources[i] - robot_cost[i]) // robots[i]))
+            else:
+                # Don't build the robot if it won't have time to contribute
+                if waiting_minutes + 1 >= minutes_left:
+                    continue
+                new_resources: Amount = tuple(  # type: ignore
+                    res - cost + (waiting_minutes + 1) * num_rob
+                    for res, cost, num_rob in zip(resources, robot_cost, robots)
+                )
+                new_robots = list(robots)
+                new_robots[index] += 1
+                search(minutes_left - waiting_minutes - 1, tuple(new_robots), new_resources)  # type: ignore
+
+    search(minutes_left, INITIAL_ROBOTS, (0, 0, 0, 0))
+    return best
+
+
+def timed_max_geodes(blueprint: dict[str, Amount], minutes_left: int) -> tuple[int, float]:
+    """Returns max_geodes() and the seconds it took"""
+    start = timer()
+    return max_geodes(blueprint, minutes_left), timer() - start
+
+
+def solve_blueprints(
+    blueprints: list[dict[str, Amount]], minutes_left: int, max_workers: int | None = None
+) -> list[tuple[int, float]]:
+    """Runs timed_max_geodes() for every blueprint, in a pool of processes since the blueprints are independent.
+    The results are in the same order as the blueprints. With max_workers=1, it runs in this process.
+    By default there's a worker per CPU, up to MAX_WORKERS.
+
+    >>> blueprint1 = {'ore': (4, 0, 0, 0), 'clay': (2, 0, 0, 0), 'obsidian': (3, 14, 0, 0), 'geode': (2, 0, 7, 0)}
+    >>> blueprint2 = {'ore': (2, 0, 0, 0), 'clay': (3, 0, 0, 0), 'obsidian': (3, 8, 0, 0), 'geode': (3, 0, 12, 0)}
+    >>> [result for result, _ in solve_blueprints([blueprint1, blueprint2], 24, max_workers=2)]
+    [9, 12]
+    """
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, MAX_WORKERS)
+    max_workers = min(max_workers, len(blueprints))
+    if max_workers <= 1:
+        return [timed_max_geodes(blueprint, minutes_left) for blueprint in blueprints]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(timed_max_geodes, blueprints, [minutes_left] * len(blueprints)))
+
+
 def sum_quality_levels(results: list[int]) -> int:
     """
     >>> sum_quality_levels([9, 12])
@@ -158,31 +261,20 @@ if __name__ == "__main__":
     with open(FILE_INPUT) as f:
         lines = f.read().rstrip().split("\n")
 
-    blueprint: dict[str, Amount] = {}
     blueprints = get_blueprints(lines)
-    results: list[int]
-
-    print("Part 1:")
-    results = []
-    for i, blueprint in enumerate(blueprints):
-        print(f"{i + 1}: {blueprint}")
-        dp_turn = make_dp_turn(blueprint)
-        max_num_geodes = dp_turn(TOTAL_MINUTES_PART1, INITIAL_ROBOTS, (0, 0, 0, 0))
-        print(max_num_geodes)
-        results.append(max_num_geodes)
-    print(sum_quality_levels(results))
-    print()
-
-    print("Part 2:")
-    results = []
-    for i, blueprint in enumerate(blueprints):
-        if i == NUM_BLUEPRINTS_PART2:
-            break
-        print(f"{i + 1}: {blueprint}")
-        dp_turn = make_dp_turn(blueprint)
-        max_num_geodes = dp_turn(TOTAL_MINUTES_PART2, INITIAL_ROBOTS, (0, 0, 0, 0))
-        print(max_num_geodes)
-        results.append(max_num_geodes)
-    print(multiply_results(results))
+
+    for part in [1, 2]:
+        print(f"Part {part}:")
+        start = timer()
+        if part == 1:
+            timed_results = solve_blueprints(blueprints, TOTAL_MINUTES_PART1)
+        else:
+            timed_results = solve_blueprints(blueprints[:NUM_BLUEPRINTS_PART2], TOTAL_MINUTES_PART2)
+        for i, (max_num_geodes, seconds) in enumerate(timed_results):
+            print(f"{i + 1}: {max_num_geodes} geodes ({seconds:4f} seconds)")
+        results = [max_num_geodes for max_num_geodes, _ in timed_results]
+        print(sum_quality_levels(results) if part == 1 else multiply_results(results))
+        print(f"{timer() - start:4f} seconds")
+        print()
 
     exit()
@@ -1,8 +1,11 @@
 import doctest
+import math
 from timeit import default_timer as timer
-from typing import List, overload, TypeVar
+from typing import Callable, Dict, Iterator, List, overload, Tuple, TypeVar
 from typing_extensions import SupportsIndex
 
+import numpy as np
+
 _T = TypeVar("_T")
 
 
@@ -19,6 +22,105 @@ class CircularList(list[_T]):
         return super().__getitem__(__i % len(self))
 
 
+class BlockList:
+    """
+    List of distinct non-negative integers split in blocks of about sqrt(n) elements (square root decomposition).
+    The lengths of the blocks are kept in a Fenwick tree, and the block of each value is stored,
+    so index(), pop() and insert() take O(log(n)) steps plus an O(sqrt(n)) list operation inside one block,
+    instead of the O(n) of a plain list.
+
+    >>> b = BlockList([0, 1, 2, 3, 4], block_size=2)
+    >>> b.index(3)
+    3
+    >>> b.pop(1)
+    1
+    >>> b.insert(3, 1)
+    >>> list(b)
+    [0, 2, 3, 1, 4]
+    >>> b.index(1), b.index(4)
+    (3, 4)
+    >>> for _ in range(4):
+    ...     b.insert(0, b.pop(4))
+    >>> list(b), [len(block) for block in b.blocks], b.index(2)
+    ([2, 3, 1, 4, 0], [2, 2, 1], 0)
+    """
+
+    def __init__(self, values: List[int], block_size: int = 0) -> None:
+        self.block_size = block_size or max(16, math.isqrt(len(values)))
+        self.block_of = [0] * (max(values) + 1 if values else 0)  # The block index of each value
+        self.blocks: List[List[int]] = []
+        self.tree: List[int] = []  # Fenwick tree of the lengths of the blocks (1-based)
+        self.length = len(values)
+        self.rebuild(values)
+
+    def rebuild(self, values: List[int]) -> None:
+        """Splits the values in blocks of block_size again"""
+        self.blocks = [values[i : i + self.block_size] for i in range(0, len(values), self.block_size)] or [[]]
+        for b, block in enumerate(self.blocks):
+            for value in block:
+                self.block_of[value] = b
+        self.tree = [0] * (len(self.blocks) + 1)
+        for b, block in enumerate(self.blocks, start=1):
+            self.tree[b] += len(block)
+            parent = b + (b & -b)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[b]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[int]:
+        for block in self.blocks:
+            yield from block
+
+    def _add(self, b: int, delta: int) -> None:
+        """Adds delta to the length of block b in the Fenwick tree"""
+        b += 1
+        while b < len(self.tree):
+            self.tree[b] += delta
+            b += b & -b
+
+    def _locate(self, i: int) -> Tuple[int, int]:
+        """Returns the block, and the index inside that block, of the i-th position"""
+        b = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            # Skips all the blocks that end before position i
+            if b + step < len(self.tree) and self.tree[b + step] <= i:
+                b += step
+                i -= self.tree[b]
+            step >>= 1
+        if b == len(self.blocks):
+            raise IndexError("BlockList index out of range")
+        return b, i
+
+    def index(self, value: int) -> int:
+        b = self.block_of[value]
+        i = self.blocks[b].index(value)
+        # Adds the lengths of all the blocks before b
+        while b:
+            i += self.tree[b]
+            b -= b & -b
+        return i
+
+    def pop(self, i: int) -> int:
+        b, j = self._locate(i)
+        self._add(b, -1)
+        self.length -= 1
+        return self.blocks[b].pop(j)
+
+    def insert(self, i: int, value: int) -> None:
+        # The position right after the end of the list goes to the last block
+        b, j = self._locate(i) if i < self.length else (len(self.blocks) - 1, len(self.blocks[-1]))
+        self.blocks[b].insert(j, value)
+        self.block_of[value] = b
+        self._add(b, 1)
+        self.length += 1
+        # Blocks that grew too much make the operations slow, so they are all split again
+        if len(self.blocks[b]) > 2 * self.block_size:
+            self.rebuild(list(self))
+
+
 FILE_INPUT = "src/adventofcode2022/day20_input.txt"
 DECRYPTION_KEY = 811589153
 NUM_ROUNDS_PART_2 = 10
@@ -98,12 +200,94 @@ def mix_array(array: List[int], num_rounds: int = 1) -> List[int]:
     This handles lists with duplicate values by doing the rotations of the indexes!!!
     (This was one of the main bugs in this problem...)
 
+    The indexes are kept in a BlockList, so each shift costs O(sqrt(n)) instead of the O(n) of shift().
+    The result is rotated exactly like shift() would do it.
+
     >>> mix_array([1, 2, -3, 3, -2, 0, 4])
     [-2, 1, 2, -3, 4, 0, 3]
     >>> mix_array([v * DECRYPTION_KEY for v in [1, 2, -3, 3, -2, 0, 4]], num_rounds=1)
     [0, -2434767459, 3246356612, -1623178306, 2434767459, 1623178306, 811589153]
     >>> mix_array([v * DECRYPTION_KEY for v in [1, 2, -3, 3, -2, 0, 4]], num_rounds=10)
     [811589153, 0, -2434767459, 1623178306, 3246356612, -1623178306, 2434767459]
+    >>> mix_array([2, 8, -3, 3, -2, 0, 4]) == mix_array_circular_list([2, 8, -3, 3, -2, 0, 4])
+    True
+    """
+    length = len(array)
+    if length < 2:
+        return list(array)
+    # Indexes in their circular order. The mixed array starts at position "offset" of this list
+    indexes = BlockList(list(range(length)))
+    offset = 0
+
+    # Perform several rounds of mixing
+    for _ in range(num_rounds):
+        # Shift each indexes by its value
+        for index, value in enumerate(array):
+            i_a = indexes.index(index)
+            indexes.pop(i_a)
+            # The index lands right before the element that is "value" steps after it (the list is 1 item shorter)
+            i_a_2 = (i_a + value) % (length - 1)
+            indexes.insert(i_a_2, index)
+            # shift() places the index at its old position in the mixed array + value
+            offset = (i_a_2 - ((i_a - offset) + value)) % length
+
+    # Build the resulting mixed array
+    ordered_indexes = list(indexes)
+    mixed_array = [array[ordered_indexes[(i + offset) % length]] for i in range(length)]
+    return mixed_array
+
+
+def mix_array_numpy(array: List[int], num_rounds: int = 1) -> List[int]:
+    """
+    Same as mix_array(), but the indexes are kept in NumPy int64 arrays.
+    Each shift moves the whole range of indexes between the old and the new position with one slice copy,
+    so there's no Python loop over the elements in between.
+
+    >>> mix_array_numpy([1, 2, -3, 3, -2, 0, 4])
+    [-2, 1, 2, -3, 4, 0, 3]
+    >>> mix_array_numpy([v * DECRYPTION_KEY for v in [1, 2, -3, 3, -2, 0, 4]], num_rounds=10)
+    [811589153, 0, -2434767459, 1623178306, 3246356612, -1623178306, 2434767459]
+    >>> mix_array_numpy([2, 8, -3, 3, -2, 0, 4], num_rounds=3) == mix_array([2, 8, -3, 3, -2, 0, 4], num_rounds=3)
+    True
+    """
+    length = len(array)
+    if length < 2:
+        return list(array)
+    # Indexes in their circular order, and the position of each index in that order
+    indexes = np.arange(length, dtype=np.int64)
+    positions = np.arange(length, dtype=np.int64)
+    offset = 0
+
+    # Perform several rounds of mixing
+    for _ in range(num_rounds):
+        # Shift each indexes by its value
+        for index, value in enumerate(array):
+            i_a = int(positions[index])
+            i_a_2 = (i_a + value) % (length - 1)
+            if i_a_2 > i_a:
+                # The indexes in between move one position to the left
+                indexes[i_a:i_a_2] = indexes[i_a + 1 : i_a_2 + 1]
+                positions[indexes[i_a:i_a_2]] -= 1
+            elif i_a_2 < i_a:
+                # The indexes in between move one position to the right
+                indexes[i_a_2 + 1 : i_a + 1] = indexes[i_a_2:i_a].copy()
+                positions[indexes[i_a_2 + 1 : i_a + 1]] += 1
+            indexes[i_a_2] = index
+            positions[index] = i_a_2
+            offset = (i_a_2 - ((i_a - offset) + value)) % length
+
+    # Build the resulting mixed array
+    mixed_array = np.array(array, dtype=np.int64)[np.roll(indexes, -offset)]
+    return [int(v) for v in mixed_array]
+
+
+def mix_array_circular_list(array: List[int], num_rounds: int = 1) -> List[int]:
+    """
+    The original implementation of mix_array(), which rebuilds the whole CircularList in every shift().
+    It's O(n^2) per round: it took 200 seconds for part 2.
+
+    >>> mix_array_circular_list([1, 2, -3, 3, -2, 0, 4])
+    [-2, 1, 2, -3, 4, 0, 3]
     """
     # Circular list of the indexes - this is what will be shifted around
     c: CircularList[int] = CircularList(list(range(len(array))))
@@ -120,6 +304,15 @@ def mix_array(array: List[int], num_rounds: int = 1) -> List[int]:
     return mixed_array
 
 
+MixEngine = Callable[[List[int], int], List[int]]
+MIX_ENGINES: Dict[str, MixEngine] = {
+    "blocklist": mix_array,
+    "numpy": mix_array_numpy,
+    "circular_list": mix_array_circular_list,  # Too slow for the problem input
+}
+DEFAULT_MIX_ENGINE = "blocklist"
+
+
 def sum_grove_coordinates(array: List[int]) -> int:
     """
     >>> sum_grove_coordinates([1, 2, -3, 4, 0, 3, -2])
@@ -144,15 +337,15 @@ if __name__ == "__main__":
         array = [int(line) for line in lines]
 
     for part in [1, 2]:
-        # Part 1: 21.433755 seconds
-        # Part 2: 200.920255 seconds
+        # With mix_array_circular_list(): Part 1 took 21.4 seconds, and Part 2 took 200.9 seconds
         print(f"Part {part}:")
-        start = timer()
         if part == 2:
             array = [v * DECRYPTION_KEY for v in array]
-        mixed_array = mix_array(array, num_rounds=1 if part == 1 else NUM_ROUNDS_PART_2)
-        print(sum_grove_coordinates(mixed_array))
-        print(f"{timer() - start:4f} seconds")
+        # Compares the fast engines
+        for engine in ["blocklist", "numpy"]:
+            start = timer()
+            mixed_array = MIX_ENGINES[engine](array, 1 if part == 1 else NUM_ROUNDS_PART_2)
+            print(f"{sum_grove_coordinates(mixed_array)} ({engine}: {timer() - start:4f} seconds)")
         print()
 
     exit()
@@ -3,6 +3,8 @@ from dataclasses import dataclass, field
 import doctest
 from typing import NamedTuple
 
+import numpy as np
+
 
 class P(NamedTuple):
     x: int
@@ -22,6 +24,26 @@ DIR = {
     "NW": P(-1, 1),
 }
 PREFERRED_DIR_ORDER = ("N", "S", "W", "E")
+EXAMPLE_MAP_LINES = [  # Used by the doctests
+    "....#..",
+    "..###.#",
+    "#...#.#",
+    ".#...##",
+    "#.###..",
+    "##.#.##",
+    ".#..#..",
+]
+# The set-based engine encodes P(x, y) as the int (y + OFFSET) * ROW + x + OFFSET, so moving is adding an offset.
+# They stay below 2**30, so that they are single-digit ints in CPython (faster to hash and add)
+ROW = 1 << 14
+OFFSET = ROW // 2
+# Beyond this, the neighbors of a point would wrap around to the next or previous row
+MAX_COORDINATE = OFFSET - 2
+OFFSETS = {d: p.y * ROW + p.x for d, p in DIR.items()}
+NEIGHBOR_OFFSETS = tuple(OFFSETS.values())
+# For each preferred direction: its offset, and the indexes in NEIGHBOR_OFFSETS of the 3 points it faces
+PREFERRED_MOVES = tuple((OFFSETS[d], tuple(i for i, _d in enumerate(DIR) if d in _d)) for d in PREFERRED_DIR_ORDER)
+GRID_MARGIN = 10  # Empty cells added around the grid of the NumPy engine when the elves reach its border
 
 
 @dataclass
@@ -71,16 +93,7 @@ def print_elves(positions: list[P]) -> None:
 
 def simulate(map_lines: list[str]) -> None:
     """
-    >>> map_lines = [
-    ...     "....#..",
-    ...     "..###.#",
-    ...     "#...#.#",
-    ...     ".#...##",
-    ...     "#.###..",
-    ...     "##.#.##",
-    ...     ".#..#..",
-    ... ]
-    >>> simulate(map_lines)
+    >>> simulate(EXAMPLE_MAP_LINES)
     Part 1: 110 empty squares after 10 rounds.
     Part 2: 20 rounds until the elves stop.
     """
@@ -132,11 +145,229 @@ def simulate(map_lines: list[str]) -> None:
     print(f"Part 2: {num_round + 1} rounds until the elves stop.")
 
 
+def encode(p: P) -> int:
+    """
+    >>> encode(P(0, 0)) == OFFSET * ROW + OFFSET, decode(encode(P(-3, 5)))
+    (True, P(x=-3, y=5))
+    >>> encode(P(0, -OFFSET))
+    Traceback (most recent call last):
+    ...
+    ValueError: P(x=0, y=-8192) is too far from the origin to be encoded with ROW = 16384
+    """
+    if abs(p.x) > MAX_COORDINATE or abs(p.y) > MAX_COORDINATE:
+        raise ValueError(f"{p} is too far from the origin to be encoded with ROW = {ROW}")
+    return (p.y + OFFSET) * ROW + p.x + OFFSET
+
+
+def decode(i: int) -> P:
+    y, x = divmod(i, ROW)
+    return P(x - OFFSET, y - OFFSET)
+
+
+def parse_elves(map_lines: list[str]) -> set[int]:
+    """The encoded positions of the elves, with y going up like in simulate()"""
+    return {
+        encode(P(x, len(map_lines) - 1 - y))
+        for y, line in enumerate(map_lines)
+        for x, char in enumerate(line)
+        if char == "#"
+    }
+
+
+def play_round(elves: set[int], num_round: int, to_check: set[int] | None = None) -> set[int]:
+    """
+    Moves the elves of the set in place.
+    Instead of each elf rotating its own directions, all of them start from direction num_round % 4.
+    Only the elves in to_check (all of them by default) are checked: the others have no neighbors.
+    Returns the elves to check in the next round: the ones that had neighbors, and the ones next to an elf that moved.
+    It's empty if no elf moved. An elf that would move past MAX_COORDINATE raises a ValueError.
+
+    >>> elves = parse_elves([".....", "..##.", "..#..", ".....", "..##.", "....."])
+    >>> [bool(play_round(elves, num_round)) for num_round in range(4)]
+    [True, True, True, False]
+    >>> sorted(decode(p) for p in elves)
+    [P(x=0, y=3), P(x=2, y=0), P(x=2, y=5), P(x=4, y=2), P(x=4, y=4)]
+    >>> play_round({encode(P(MAX_COORDINATE - 1, 0)), encode(P(MAX_COORDINATE, 0))}, 3)
+    Traceback (most recent call last):
+    ...
+    ValueError: P(x=8191, y=0) is too far from the origin to be encoded with ROW = 16384
+    """
+    moves_order = PREFERRED_MOVES[num_round % 4 :] + PREFERRED_MOVES[: num_round % 4]
+    proposers: dict[int, list[int]] = {}
+    crowded: set[int] = set()
+    is_elf = elves.__contains__
+    for p in elves if to_check is None else to_check:
+        occupied = [is_elf(p + offset) for offset in NEIGHBOR_OFFSETS]
+        # Elf doesn't want to move if there's no one around him
+        if True not in occupied:
+            continue
+        crowded.add(p)
+        for offset, (i, j, k) in moves_order:
+            if not (occupied[i] or occupied[j] or occupied[k]):
+                proposers.setdefault(p + offset, []).append(p)
+                break
+    targets: list[int] = []
+    for target, elves_proposing in proposers.items():
+        # Elves only move if they're the only one proposing that point
+        if len(elves_proposing) == 1:
+            y, x = divmod(target, ROW)
+            if abs(x - OFFSET) > MAX_COORDINATE or abs(y - OFFSET) > MAX_COORDINATE:
+                raise ValueError(f"{decode(target)} is too far from the origin to be encoded with ROW = {ROW}")
+            elves.remove(elves_proposing[0])
+            elves.add(target)
+            targets.append(target)
+    if not targets:
+        return set()
+    # An elf that didn't have neighbors can only get one if an elf moved next to it
+    to_check_next = crowded & elves
+    for target in targets:
+        to_check_next.add(target)
+        to_check_next.update(target + offset for offset in NEIGHBOR_OFFSETS if target + offset in elves)
+    return to_check_next
+
+
+def empty_squares(elves: set[int]) -> int:
+    """
+    >>> empty_squares(parse_elves(["#..", "...", "..#"]))
+    7
+    """
+    min_x, max_x, min_y, max_y = get_min_max([decode(p) for p in elves])
+    return (max_x - min_x + 1) * (max_y - min_y + 1) - len(elves)
+
+
+def empty_squares_after(map_lines: list[str], num_rounds: int) -> int:
+    """
+    >>> empty_squares_after(EXAMPLE_MAP_LINES, NUM_ROUNDS_PART1)
+    110
+    """
+    elves = parse_elves(map_lines)
+    to_check = set(elves)
+    for num_round in range(num_rounds):
+        if not to_check:
+            break
+        to_check = play_round(elves, num_round, to_check)
+    return empty_squares(elves)
+
+
+def simulate_set(map_lines: list[str]) -> tuple[int, int]:
+    """
+    Same as simulate(), with a single set of the elves' positions.
+    Returns the answers instead of printing them.
+
+    >>> simulate_set(EXAMPLE_MAP_LINES)
+    (110, 20)
+    """
+    elves = parse_elves(map_lines)
+    to_check = set(elves)
+    num_round = 0
+    empty_squares_part1 = None
+    while to_check:
+        if num_round == NUM_ROUNDS_PART1:
+            empty_squares_part1 = empty_squares(elves)
+        to_check = play_round(elves, num_round, to_check)
+        num_round += 1
+    if empty_squares_part1 is None:
+        # The elves stopped before the end of part 1
+        empty_squares_part1 = empty_squares(elves)
+    return empty_squares_part1, num_round
+
+
+def parse_grid(map_lines: list[str]) -> np.ndarray:
+    """The elves as a boolean grid with an empty border. The rows go south, like in the map"""
+    grid = np.array([[char == "#" for char in line] for line in map_lines], dtype=bool)
+    return np.pad(grid, GRID_MARGIN)
+
+
+def shifted(grid: np.ndarray, d: P) -> np.ndarray:
+    """
+    The view of the grid that has, for each cell inside the border, the cell at direction d from it
+
+    >>> grid = np.arange(9).reshape(3, 3)
+    >>> shifted(grid, P(0, 0)), shifted(grid, DIR["N"]), shifted(grid, DIR["SE"])
+    (array([[4]]), array([[1]]), array([[8]]))
+    """
+    num_rows, num_cols = grid.shape
+    return grid[1 - d.y : num_rows - 1 - d.y, 1 + d.x : num_cols - 1 + d.x]
+
+
+def play_round_numpy(grid: np.ndarray, num_round: int) -> tuple[np.ndarray, bool]:
+    """
+    Same as play_round(), with every step done on the whole grid at once:
+    the neighbors are shifted views of the grid, and the proposals to each cell are counted in an array.
+    Returns the new grid (larger if the elves reached the border) and whether any elf moved.
+
+    >>> grid = parse_grid([".....", "..##.", "..#..", ".....", "..##.", "....."])
+    >>> moved = []
+    >>> for num_round in range(4):
+    ...     grid, elf_moved = play_round_numpy(grid, num_round)
+    ...     moved.append(elf_moved)
+    >>> moved, empty_squares_grid(grid)
+    ([True, True, True, False], 25)
+    """
+    if grid[0].any() or grid[-1].any() or grid[:, 0].any() or grid[:, -1].any():
+        grid = np.pad(grid, GRID_MARGIN)
+    occupied = {d: shifted(grid, p) for d, p in DIR.items()}
+    free = {d: ~np.logical_or.reduce([occupied[_d] for _d in DIR if d in _d]) for d in PREFERRED_DIR_ORDER}
+    # Elf doesn't want to move if there's no one around him
+    undecided = shifted(grid, P(0, 0)) & ~np.logical_and.reduce(list(free.values()))
+    num_proposals = np.zeros(grid.shape, dtype=np.int8)
+    proposals: dict[str, np.ndarray] = {}
+    for d in PREFERRED_DIR_ORDER[num_round % 4 :] + PREFERRED_DIR_ORDER[: num_round % 4]:
+        proposals[d] = undecided & free[d]
+        undecided &= ~proposals[d]
+        targets = shifted(num_proposals, DIR[d])
+        targets += proposals[d]
+    new_grid = grid.copy()
+    moved = False
+    for d, proposal in proposals.items():
+        # Elves only move if they're the only one proposing that point
+        moving = proposal & (shifted(num_proposals, DIR[d]) == 1)
+        if moving.any():
+            moved = True
+            shifted(new_grid, P(0, 0))[moving] = False
+            shifted(new_grid, DIR[d])[moving] = True
+    return new_grid, moved
+
+
+def empty_squares_grid(grid: np.ndarray) -> int:
+    rows = np.flatnonzero(grid.any(axis=1))
+    columns = np.flatnonzero(grid.any(axis=0))
+    return int((rows[-1] - rows[0] + 1) * (columns[-1] - columns[0] + 1) - grid.sum())
+
+
+def simulate_numpy(map_lines: list[str], max_rounds: int | None = None) -> tuple[int, int]:
+    """
+    Same as simulate_set(), with the NumPy engine.
+    With max_rounds, it stops after that many rounds (and the 2nd answer is the number of rounds played).
+
+    >>> simulate_numpy(EXAMPLE_MAP_LINES)
+    (110, 20)
+    >>> simulate_numpy(EXAMPLE_MAP_LINES, NUM_ROUNDS_PART1)
+    (110, 10)
+    """
+    grid = parse_grid(map_lines)
+    num_round = 0
+    empty_squares_part1 = None
+    moved = True
+    while moved and (max_rounds is None or num_round < max_rounds):
+        if num_round == NUM_ROUNDS_PART1:
+            empty_squares_part1 = empty_squares_grid(grid)
+        grid, moved = play_round_numpy(grid, num_round)
+        num_round += 1
+    if empty_squares_part1 is None:
+        # The elves stopped before the end of part 1
+        empty_squares_part1 = empty_squares_grid(grid)
+    return empty_squares_part1, num_round
+
+
 if __name__ == "__main__":
     assert not doctest.testmod().failed
 
     with open(FILE_INPUT) as f:
         map_lines = f.read().rstrip().split("\n")
 
-    simulate(map_lines)
+    # simulate() took minutes, with each round O(n^2) in the number of elves. simulate_numpy() is ~10x faster than this
+    empty_squares_part1, num_rounds_part2 = simulate_set(map_lines)
+    print(f"Part 1: {empty_squares_part1} empty squares after {NUM_ROUNDS_PART1} rounds.")
+    print(f"Part 2: {num_rounds_part2} rounds until the elves stop.")
     exit()
@@ -2,7 +2,8 @@ from collections import deque
 from dataclasses import dataclass
 import doctest
 from functools import lru_cache
-from typing import NamedTuple
+import math
+from typing import Callable, Generic, Iterable, NamedTuple, Sequence, TypeVar
 
 
 class P(NamedTuple):
@@ -41,6 +42,19 @@ DIR = {
     "<": P(-1, 0),
     "^": P(0, -1),
 }
+EXAMPLE_LINES = [  # Used by the doctests
+    "#.######",
+    "#>>.<^<#",
+    "#.<..<<#",
+    "#>v.><>#",
+    "#<^v^^>#",
+    "######.#",
+]
+BLOCKED_LINES = [  # The only cell of the valley always has a blizzard, so the end can't be reached
+    "#.#",
+    "#>#",
+    "#.#",
+]
 # Global vars
 start: P
 end: P
@@ -161,12 +175,362 @@ def simulate(lines: list[str], part: int) -> int:
     return total_turns
 
 
+def rotate(mask: int, shift: int, size: int) -> int:
+    """
+    Rotates the lowest size bits of mask towards the highest bits (or the lowest, with a negative shift)
+
+    >>> bin(rotate(0b0011, 3, 4)), bin(rotate(0b0011, -1, 4))
+    ('0b1001', '0b1001')
+    """
+    shift %= size
+    return ((mask << shift) | (mask >> (size - shift))) & ((1 << size) - 1)
+
+
+class Valley(NamedTuple):
+    """
+    The inside of the valley, without the walls: (0, 0) is the top left corner of the inside.
+    The start is just above the first row and the end just below the last row.
+    The blizzards repeat every width turns in the rows, and every height turns in the columns.
+    """
+
+    width: int
+    height: int
+    start: P
+    end: P
+    blizzard_rows: list[list[int]]  # blizzard_rows[turn % width][y] has bit x set if a < or > blizzard is in (x, y)
+    blizzard_columns: list[list[int]]  # blizzard_columns[turn % height][x] has bit y set if a ^ or v blizzard is there
+    direction_rows: dict[str, list[int]]  # direction_rows[c][y] has bit x set if a c blizzard is in (x, y) at turn 0
+
+    def occupied_row(self, y: int, turn: int) -> int:
+        """
+        The bitmask of the blizzards in row y, from the blizzards of each direction rotated by the turn.
+        In a row, the < and > blizzards rotate. The ^ and v blizzards come from the row turn places before.
+
+        >>> valley = parse_valley(EXAMPLE_LINES)
+        >>> [bin(valley.occupied_row(0, turn)) for turn in (0, 1)]
+        ['0b111011', '0b10110']
+        """
+        width, height = self.width, self.height
+        return (
+            rotate(self.direction_rows[">"][y], turn, width)
+            | rotate(self.direction_rows["<"][y], -turn, width)
+            | self.direction_rows["v"][(y - turn) % height]
+            | self.direction_rows["^"][(y + turn) % height]
+        )
+
+    @property
+    def period(self) -> int:
+        """The blizzards are back where they started every lcm(width, height) turns"""
+        return math.lcm(self.width, self.height)
+
+    def occupancy(self, turn: int) -> bytes:
+        """
+        The cells with blizzards at a turn, as a flat array with a 1 at y * width + x if (x, y) has a blizzard
+
+        >>> parse_valley(EXAMPLE_LINES).occupancy(0)[:6]
+        b'\\x01\\x01\\x00\\x01\\x01\\x01'
+        """
+        width, height = self.width, self.height
+        rows = self.blizzard_rows[turn % width]
+        columns = self.blizzard_columns[turn % height]
+        return bytes(rows[y] >> x & 1 | columns[x] >> y & 1 for y in range(height) for x in range(width))
+
+    def free_rows(self, turn: int) -> list[int]:
+        """
+        The bitmasks of the positions without blizzards at a turn, with the entrance and exit rows first and last
+
+        >>> [bin(row) for row in parse_valley(EXAMPLE_LINES).free_rows(1)]
+        ['0b1', '0b101001', '0b100110', '0b100100', '0b1100', '0b100000']
+        """
+        full_row = (1 << self.width) - 1
+        inside = [full_row & ~self.occupied_row(y, turn) for y in range(self.height)]
+        return [1 << self.start.x] + inside + [1 << self.end.x]
+
+    def check_waypoint(self, p: P) -> None:
+        """
+        Raises a ValueError if p is in a wall: waypoints are the start, the end, or inside the valley
+
+        >>> parse_valley(EXAMPLE_LINES).check_waypoint(P(3, -1))
+        Traceback (most recent call last):
+        ...
+        ValueError: P(x=3, y=-1) is not the start, the end, or inside the valley
+        """
+        if p not in (self.start, self.end) and not (0 <= p.x < self.width and 0 <= p.y < self.height):
+            raise ValueError(f"{p} is not the start, the end, or inside the valley")
+
+    def is_free(self, p: P, turn: int) -> bool:
+        """
+        >>> valley = parse_valley(EXAMPLE_LINES)
+        >>> valley.is_free(P(0, 0), 0), valley.is_free(P(2, 0), 0), valley.is_free(P(1, 0), 1)
+        (False, True, False)
+        """
+        return not (
+            self.blizzard_rows[turn % self.width][p.y] >> p.x & 1
+            or self.blizzard_columns[turn % self.height][p.x] >> p.y & 1
+        )
+
+
+def parse_valley(lines: list[str]) -> Valley:
+    """
+    >>> valley = parse_valley(EXAMPLE_LINES)
+    >>> valley.width, valley.height, valley.start, valley.end
+    (6, 4, P(x=0, y=-1), P(x=5, y=4))
+    >>> [bin(mask) for mask in valley.blizzard_rows[0]]
+    ['0b101011', '0b110010', '0b111001', '0b100001']
+    """
+    width = len(lines[0]) - 2
+    height = len(lines) - 2
+    start = P(lines[0].index(".") - 1, -1)
+    end = P(lines[-1].index(".") - 1, height)
+    # Bitmasks of the blizzards at turn 0, for each direction
+    rows = {c: [0] * height for c in "<>"}
+    columns = {c: [0] * width for c in "^v"}
+    direction_rows = {c: [0] * height for c in DIR}
+    for y, line in enumerate(lines[1:-1]):
+        for x, c in enumerate(line[1:-1]):
+            if c in direction_rows:
+                direction_rows[c][y] |= 1 << x
+            if c in rows:
+                rows[c][y] |= 1 << x
+            elif c in columns:
+                columns[c][x] |= 1 << y
+    blizzard_rows = [
+        [rotate(right, turn, width) | rotate(left, -turn, width) for right, left in zip(rows[">"], rows["<"])]
+        for turn in range(width)
+    ]
+    blizzard_columns = [
+        [rotate(down, turn, height) | rotate(up, -turn, height) for down, up in zip(columns["v"], columns["^"])]
+        for turn in range(height)
+    ]
+    return Valley(width, height, start, end, blizzard_rows, blizzard_columns, direction_rows)
+
+
+Phase = TypeVar("Phase")
+
+
+class PhaseCache(Generic[Phase]):
+    """
+    The blizzards repeat every period turns, so whatever is computed from them at a turn (with compute)
+    is stored once per phase of that period, the first time it's needed.
+    The hits and misses are counted, to inspect how well the cache works.
+
+    >>> valley = parse_valley(EXAMPLE_LINES)
+    >>> cache = PhaseCache(valley.period, valley.occupancy)
+    >>> cache.period, cache.at(0)[:3], cache.at(0)[:3], cache.at(12)[:3]
+    (12, b'\\x01\\x01\\x00', b'\\x01\\x01\\x00', b'\\x01\\x01\\x00')
+    >>> cache.hits, cache.misses, len(cache)
+    (2, 1, 1)
+    """
+
+    def __init__(self, period: int, compute: Callable[[int], Phase]) -> None:
+        self.period = period
+        self.compute = compute
+        self.phases: list[Phase | None] = [None] * period
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(value is not None for value in self.phases)
+
+    def at(self, turn: int) -> Phase:
+        phase = turn % self.period
+        value = self.phases[phase]
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = self.phases[phase] = self.compute(turn)
+        return value
+
+
+def shortest_time(valley: Valley, a: P, b: P, turn: int, occupancy: PhaseCache[bytes] | None = None) -> int:
+    """
+    Returns the turn when b is reached, leaving from a at the given turn.
+    Instead of a stack of (position, turn) states, it keeps the set of positions that can be reached at each turn.
+    The blizzards come from the occupancy cache, which can be shared between trips.
+    If the same positions are reached at the same phase of the blizzards twice, b can't be reached.
+
+    >>> valley = parse_valley(EXAMPLE_LINES)
+    >>> occupancy = PhaseCache(valley.period, valley.occupancy)
+    >>> shortest_time(valley, valley.start, valley.end, 0, occupancy)
+    18
+    >>> shortest_time(valley, valley.end, valley.start, 18, occupancy)
+    41
+    >>> occupancy.hits, occupancy.misses
+    (29, 12)
+    >>> inside = [P(x, y) for x in range(valley.width) for y in range(valley.height)]
+    >>> [shortest_time(valley, valley.start, p, 0) for p in inside] == [
+    ...     shortest_time_bitset(valley, valley.start, p, 0) for p in inside
+    ... ]
+    True
+    >>> shortest_time(parse_valley(BLOCKED_LINES), P(0, -1), P(0, 1), 0)
+    Traceback (most recent call last):
+    ...
+    ValueError: P(x=0, y=1) can't be reached from P(x=0, y=-1)
+    """
+    valley.check_waypoint(a)
+    valley.check_waypoint(b)
+    width, height = valley.width, valley.height
+    if occupancy is None:
+        occupancy = PhaseCache(valley.period, valley.occupancy)
+    seen: set[tuple[int, frozenset[P]]] = set()
+    frontier = {a}
+    while frontier:
+        turn += 1
+        occupied = occupancy.at(turn)
+        next_frontier: set[P] = set()
+        for p in frontier:
+            for n in (p, P(p.x + 1, p.y), P(p.x, p.y + 1), P(p.x - 1, p.y), P(p.x, p.y - 1)):
+                if 0 <= n.x < width and 0 <= n.y < height:
+                    if occupied[n.y * width + n.x]:
+                        continue
+                elif n != valley.start and n != valley.end:
+                    # Walls. We can always wait in (or go back to) the entrance and the exit
+                    continue
+                if n == b:
+                    return turn
+                next_frontier.add(n)
+        frontier = next_frontier
+        state = (turn % valley.period, frozenset(frontier))
+        if state in seen:
+            break
+        seen.add(state)
+    raise ValueError(f"{b} can't be reached from {a}")
+
+
+def shortest_time_bitset(valley: Valley, a: P, b: P, turn: int, free_rows: PhaseCache[list[int]] | None = None) -> int:
+    """
+    Same as shortest_time(), with each row of the reachable positions in an int bitmask, bit x for (x, y).
+    Moving is shifting and OR-ing the rows, and the blizzards are removed with the masks of Valley.free_rows(),
+    from the free_rows cache.
+    The entrance and exit are 2 extra rows, where only the opening can be reached.
+    Each turn costs a few operations per row, however many positions can be reached.
+
+    >>> valley = parse_valley(EXAMPLE_LINES)
+    >>> shortest_time_bitset(valley, valley.start, valley.end, 0)
+    18
+    >>> shortest_time_bitset(valley, valley.end, valley.start, 18)
+    41
+    >>> shortest_time_bitset(parse_valley(BLOCKED_LINES), P(0, -1), P(0, 1), 0)
+    Traceback (most recent call last):
+    ...
+    ValueError: P(x=0, y=1) can't be reached from P(x=0, y=-1)
+    """
+    valley.check_waypoint(a)
+    valley.check_waypoint(b)
+    height = valley.height
+    if free_rows is None:
+        free_rows = PhaseCache(valley.period, valley.free_rows)
+    seen: set[tuple[int, tuple[int, ...]]] = set()
+    # Row y of the valley is reached[y + 1]
+    reached = [0] * (height + 2)
+    reached[a.y + 1] = 1 << a.x
+    while any(reached):
+        turn += 1
+        free = free_rows.at(turn)
+        next_reached = []
+        for i, row in enumerate(reached):
+            moves = row | row << 1 | row >> 1
+            if i > 0:
+                moves |= reached[i - 1]
+            if i <= height:
+                moves |= reached[i + 1]
+            next_reached.append(moves & free[i])
+        reached = next_reached
+        if reached[b.y + 1] >> b.x & 1:
+            return turn
+        # If the same positions were reached at the same phase of the blizzards, the search is going in circles
+        state = (turn % valley.period, tuple(reached))
+        if state in seen:
+            break
+        seen.add(state)
+    raise ValueError(f"{b} can't be reached from {a}")
+
+
+class TripPlanner:
+    """
+    Parses a valley once, and plans any number of trips through it, each one a sequence of waypoints.
+    The free rows of each phase of the blizzards' period are kept between trips, and there's no global state,
+    so several planners can be used at the same time.
+
+    >>> planner = TripPlanner(EXAMPLE_LINES)
+    >>> start, end = planner.valley.start, planner.valley.end
+    >>> planner.trip([start, end]), planner.trip([start, end, start, end])
+    (18, 54)
+    >>> planner.trips([([end, start], 18), ([start, P(5, 3), end], 0), ([start, end], 12)])
+    [41, 18, 30]
+    >>> len(planner.free_rows), planner.free_rows.hits, planner.free_rows.misses
+    (12, 119, 12)
+    """
+
+    def __init__(self, lines: list[str]) -> None:
+        self.valley = parse_valley(lines)
+        self.free_rows = PhaseCache(self.valley.period, self.valley.free_rows)
+
+    def trip(self, waypoints: Sequence[P], turn: int = 0) -> int:
+        """
+        Returns the turn when the last waypoint is reached, leaving from the first one at the given turn.
+        Raises a ValueError if a waypoint is in a wall, or can't be reached.
+
+        >>> planner = TripPlanner(EXAMPLE_LINES)
+        >>> planner.trip([planner.valley.start, P(3, -1)])
+        Traceback (most recent call last):
+        ...
+        ValueError: P(x=3, y=-1) is not the start, the end, or inside the valley
+        """
+        for p in waypoints:
+            self.valley.check_waypoint(p)
+        for a, b in zip(waypoints, waypoints[1:]):
+            turn = shortest_time_bitset(self.valley, a, b, turn, self.free_rows)
+        return turn
+
+    def trips(self, queries: Iterable[tuple[Sequence[P], int]]) -> list[int]:
+        """Plans independent trips, each one given as (waypoints, turn)"""
+        return [self.trip(waypoints, turn) for waypoints, turn in queries]
+
+
+def simulate_frontier(lines: list[str], part: int) -> int:
+    """
+    Same as simulate(), with the search in shortest_time()
+
+    >>> simulate_frontier(EXAMPLE_LINES, part=1)
+    18
+    >>> simulate_frontier(EXAMPLE_LINES, part=2)
+    54
+    """
+    valley = parse_valley(lines)
+    # The same cache is used by all the trips
+    occupancy = PhaseCache(valley.period, valley.occupancy)
+    goals = [valley.end] if part == 1 else [valley.end, valley.start, valley.end]
+    turn = 0
+    p = valley.start
+    for goal in goals:
+        turn = shortest_time(valley, p, goal, turn, occupancy)
+        p = goal
+    return turn
+
+
+def simulate_bitset(lines: list[str], part: int) -> int:
+    """
+    Same as simulate(), with the search in shortest_time_bitset(), through a TripPlanner
+
+    >>> simulate_bitset(EXAMPLE_LINES, part=1)
+    18
+    >>> simulate_bitset(EXAMPLE_LINES, part=2)
+    54
+    """
+    planner = TripPlanner(lines)
+    start, end = planner.valley.start, planner.valley.end
+    return planner.trip([start, end] if part == 1 else [start, end, start, end])
+
+
 if __name__ == "__main__":
     assert not doctest.testmod().failed
 
     with open(FILE_INPUT) as f:
         lines = f.read().rstrip().split("\n")
 
-    print(simulate(lines, part=1))
-    print(simulate(lines, part=2))
+    # With simulate(), Part 2 took 8.5 seconds. With simulate_frontier(), 2.5 seconds
+    print(simulate_bitset(lines, part=1))
+    print(simulate_bitset(lines, part=2))
     exit()
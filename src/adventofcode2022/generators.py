@@ -0,0 +1,495 @@
+"""
+Synthetic inputs of arbitrary size for every day, to benchmark how the solutions scale.
+
+Every generator takes a size knob (the main dimension of that day's input: number of lines, grid side, ...)
+and a seeded random.Random, and returns the input text in the same format as dayXX_input.txt.
+"""
+
+import math
+import random
+from string import ascii_letters, ascii_lowercase, ascii_uppercase
+from typing import Callable
+
+import day07
+import day25
+
+Generator = Callable[[int, random.Random], str]
+
+DEFAULT_SEED = 0
+
+
+def _name(rng: random.Random, used: set[str], letters: str = ascii_lowercase, length: int = 4) -> str:
+    """
+    Returns a random name that is not in used (and adds it to used).
+    If most of the names of that length are used, it makes the name longer.
+
+    >>> used = set(ascii_lowercase)
+    >>> len(_name(random.Random(0), used, length=1))
+    2
+    """
+    num_attempts = 0
+    while True:
+        name = "".join(rng.choice(letters) for _ in range(length))
+        if name not in used:
+            used.add(name)
+            return name
+        num_attempts += 1
+        if num_attempts >= len(letters) ** length:
+            length += 1
+            num_attempts = 0
+
+
+def _primes(n: int) -> list[int]:
+    """
+    >>> _primes(5)
+    [2, 3, 5, 7, 11]
+    """
+    primes: list[int] = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def generate_day01(size: int, rng: random.Random) -> str:
+    """size: number of elves"""
+    blocks = ["\n".join(str(rng.randint(1000, 60000)) for _ in range(rng.randint(1, 15))) for _ in range(size)]
+    return "\n\n".join(blocks)
+
+
+def generate_day02(size: int, rng: random.Random) -> str:
+    """size: number of rounds"""
+    return "\n".join(f"{rng.choice('ABC')} {rng.choice('XYZ')}" for _ in range(size))
+
+
+def generate_day03(size: int, rng: random.Random) -> str:
+    """size: number of rucksacks (rounded up to groups of 3)"""
+    lines: list[str] = []
+    for _ in range(math.ceil(size / 3)):
+        # Each elf of the group gets its own letters, so the badge is the only item common to the 3 of them
+        badge = rng.choice(ascii_letters)
+        letters = [c for c in ascii_letters if c != badge]
+        rng.shuffle(letters)
+        for i in range(3):
+            own_letters = letters[i * 17 : (i + 1) * 17]
+            duplicate = own_letters[0]
+            left_pool, right_pool = own_letters[1:9], own_letters[9:]
+            half_size = rng.randint(4, 16)
+            left = [duplicate, badge] + [rng.choice(left_pool) for _ in range(half_size - 2)]
+            right = [duplicate] + [rng.choice(right_pool) for _ in range(half_size - 1)]
+            rng.shuffle(left)
+            rng.shuffle(right)
+            lines.append("".join(left + right))
+    return "\n".join(lines)
+
+
+def generate_day04(size: int, rng: random.Random) -> str:
+    """size: number of pairs"""
+    lines: list[str] = []
+    for _ in range(size):
+        a, b = sorted([rng.randint(1, 99), rng.randint(1, 99)])
+        c, d = sorted([rng.randint(1, 99), rng.randint(1, 99)])
+        lines.append(f"{a}-{b},{c}-{d}")
+    return "\n".join(lines)
+
+
+def generate_day05(size: int, rng: random.Random) -> str:
+    """size: number of moves"""
+    num_stacks = 9
+    stacks = [[rng.choice(ascii_uppercase) for _ in range(rng.randint(2, 7))] for _ in range(num_stacks)]
+    # The last stack must be the tallest, because the lines of the drawing are right-stripped
+    stacks[-1] += [rng.choice(ascii_uppercase) for _ in range(8 - len(stacks[-1]))]
+    height = max(len(stack) for stack in stacks)
+    drawing = [
+        " ".join(f"[{stack[level]}]" if level < len(stack) else "   " for stack in stacks)
+        for level in range(height - 1, -1, -1)
+    ]
+    drawing.append(" ".join(f" {i + 1} " for i in range(num_stacks)))
+    # Simulate the moves, so that they are always possible and no stack is ever emptied
+    heights = [len(stack) for stack in stacks]
+    moves: list[str] = []
+    for _ in range(size):
+        from_stack = rng.choice([i for i, h in enumerate(heights) if h > 1])
+        to_stack = rng.choice([i for i in range(num_stacks) if i != from_stack])
+        num = rng.randint(1, heights[from_stack] - 1)
+        heights[from_stack] -= num
+        heights[to_stack] += num
+        moves.append(f"move {num} from {from_stack + 1} to {to_stack + 1}")
+    return "\n".join(drawing) + "\n\n" + "\n".join(moves)
+
+
+def generate_day06(size: int, rng: random.Random) -> str:
+    """size: length of the datastream. Both markers are only found at its very end"""
+    # With only 3 letters there's never a start-of-packet marker
+    prefix = "".join(rng.choice("abc") for _ in range(max(size - 14, 0)))
+    return prefix + "".join(rng.sample(ascii_lowercase[3:], 14))
+
+
+def generate_day07(size: int, rng: random.Random) -> str:
+    """
+    size: number of directories.
+    A few large files bring the total size above DISK_SIZE - UPDATE_SIZE, so that part 2 has to free some space.
+
+    >>> needed_size = day07.DISK_SIZE - day07.UPDATE_SIZE
+    >>> all(day07.update_directory_sizes(day07.build_tree(day07.parse_input(generate(7, size, 0)))) > needed_size
+    ...     for size in (1, 10, 60, 500, 2000))
+    True
+    """
+    used: set[str] = set()
+    # Build a random tree of directories, as a parent -> children dict
+    children: dict[int, list[int]] = {0: []}
+    for directory in range(1, size):
+        children[rng.randrange(directory)].append(directory)
+        children[directory] = []
+    names = {directory: _name(rng, used, length=rng.randint(1, 8)) for directory in children}
+    # There are 2 files per directory on average, so the small files add up to about 20M at most
+    max_file_size = max(min(300_000, 20_000_000 // size), 1000)
+    file_sizes = {
+        directory: [rng.randint(1000, max_file_size) for _ in range(rng.randint(0, 4))] for directory in children
+    }
+    total_size = day07.DISK_SIZE - day07.UPDATE_SIZE + rng.randint(5_000_000, 25_000_000)
+    missing_size = total_size - sum(map(sum, file_sizes.values()))
+    if missing_size > 0:
+        num_large_files = rng.randint(1, 4)
+        for _ in range(num_large_files):
+            file_sizes[rng.randrange(len(children))].append(missing_size // num_large_files + 1)
+    lines: list[str] = ["$ cd /"]
+
+    def explore(directory: int) -> None:
+        lines.append("$ ls")
+        for child in children[directory]:
+            lines.append(f"dir {names[child]}")
+        for file_size in file_sizes[directory]:
+            lines.append(f"{file_size} {_name(rng, used, length=rng.randint(1, 8))}.txt")
+        for child in children[directory]:
+            lines.append(f"$ cd {names[child]}")
+            explore(child)
+            lines.append("$ cd ..")
+
+    explore(0)
+    return "\n".join(lines)
+
+
+def generate_day08(size: int, rng: random.Random) -> str:
+    """size: side of the square forest"""
+    return "\n".join("".join(str(rng.randint(0, 9)) for _ in range(size)) for _ in range(size))
+
+
+def generate_day09(size: int, rng: random.Random) -> str:
+    """size: number of motions"""
+    return "\n".join(f"{rng.choice('RLUD')} {rng.randint(1, 20)}" for _ in range(size))
+
+
+def generate_day10(size: int, rng: random.Random) -> str:
+    """size: number of instructions"""
+    return "\n".join("noop" if rng.random() < 0.3 else f"addx {rng.randint(-20, 20)}" for _ in range(size))
+
+
+def generate_day11(size: int, rng: random.Random) -> str:
+    """size: number of monkeys"""
+    num_monkeys = max(size, 2)
+    divisors = _primes(num_monkeys + 4)[4:]
+    rng.shuffle(divisors)
+    blocks: list[str] = []
+    for m in range(num_monkeys):
+        items = ", ".join(str(rng.randint(50, 99)) for _ in range(rng.randint(1, 8)))
+        if m == 0:
+            operation = "old * old"
+        else:
+            operation = f"old {rng.choice('*+')} {rng.randint(1, 19)}"
+        if_true, if_false = rng.sample([i for i in range(num_monkeys) if i != m] * 2, 2)
+        blocks.append(
+            f"Monkey {m}:\n"
+            f"  Starting items: {items}\n"
+            f"  Operation: new = {operation}\n"
+            f"  Test: divisible by {divisors[m]}\n"
+            f"    If true: throw to monkey {if_true}\n"
+            f"    If false: throw to monkey {if_false}"
+        )
+    return "\n\n".join(blocks)
+
+
+def generate_day12(size: int, rng: random.Random) -> str:
+    """
+    size: number of rows. The map is 4x wider than tall, and climbs from S (top left) to E (bottom right)
+
+    >>> import day12
+    >>> all(day12.best_path_length_bfs(generate(12, size, seed).split(), True)
+    ...     for size in range(1, 13) for seed in (0, 1))
+    True
+    """
+    num_rows = max(size, 5)
+    num_cols = max(4 * num_rows, 30)
+    max_distance = num_rows + num_cols - 2
+    step = max(1, (max_distance - 2) // 26)
+    lines: list[str] = []
+    for r in range(num_rows):
+        line = ""
+        for c in range(num_cols):
+            # The ramp starts at "a" next to S, so it only climbs 1 at a time
+            height = min(25, max(0, (r + c - 1) // step))
+            # Random pits: going down is always possible, so they never block the way to E
+            if height < 24 and rng.random() < 0.1:
+                height = 0
+            line += ascii_lowercase[height]
+        lines.append(line)
+    lines[0] = "S" + lines[0][1:]
+    lines[-1] = lines[-1][:-1] + "E"
+    return "\n".join(lines)
+
+
+def _packet(rng: random.Random, depth: int = 0) -> str:
+    if depth > 3 or rng.random() < 0.3:
+        return str(rng.randint(0, 10))
+    return "[" + ",".join(_packet(rng, depth + 1) for _ in range(rng.randint(0, 5))) + "]"
+
+
+def generate_day13(size: int, rng: random.Random) -> str:
+    """size: number of packet pairs"""
+    pairs: list[str] = []
+    for _ in range(size):
+        packet1, packet2 = ("[" + ",".join(_packet(rng) for _ in range(rng.randint(0, 5))) + "]" for _ in range(2))
+        pairs.append(f"{packet1}\n{packet2}")
+    return "\n\n".join(pairs)
+
+
+def generate_day14(size: int, rng: random.Random) -> str:
+    """size: number of rock paths. The cave gets wider and deeper with the size"""
+    half_width = 20 + size // 2
+    depth = 20 + size
+    lines: list[str] = []
+    for _ in range(size):
+        x, y = rng.randint(500 - half_width, 500 + half_width), rng.randint(5, depth)
+        points = [f"{x},{y}"]
+        for i in range(rng.randint(1, 4)):
+            if i % 2:
+                y = min(depth, max(5, y + rng.randint(-6, 6)))
+            else:
+                x = x + rng.randint(-6, 6)
+            points.append(f"{x},{y}")
+        lines.append(" -> ".join(points))
+    return "\n".join(lines)
+
+
+def generate_day15(size: int, rng: random.Random) -> str:
+    """
+    size: number of sensors
+    A hidden distress beacon is placed in the search area, and every sensor's closest beacon is nearer than it.
+    """
+    max_xy = 4_000_000
+    hidden = (rng.randint(0, max_xy), rng.randint(0, max_xy))
+    lines: list[str] = []
+    for _ in range(size):
+        sx, sy = rng.randint(0, max_xy), rng.randint(0, max_xy)
+        distance_to_hidden = abs(sx - hidden[0]) + abs(sy - hidden[1])
+        distance = rng.randint(max(0, distance_to_hidden // 2), max(0, distance_to_hidden - 1))
+        dx = rng.randint(-distance, distance)
+        dy = (distance - abs(dx)) * rng.choice([-1, 1])
+        lines.append(f"Sensor at x={sx}, y={sy}: closest beacon is at x={sx + dx}, y={sy + dy}")
+    return "\n".join(lines)
+
+
+def generate_day16(size: int, rng: random.Random) -> str:
+    """size: number of valves. About 1 in 4 valves has a non-zero flow rate"""
+    used: set[str] = {"AA"}
+    valves = ["AA"] + [_name(rng, used, ascii_uppercase, 2) for _ in range(max(size, 2) - 1)]
+    tunnels: dict[str, set[str]] = {valve: set() for valve in valves}
+    # A random spanning tree keeps every valve reachable, then a few extra tunnels make loops
+    for i, valve in enumerate(valves[1:], start=1):
+        other = valves[rng.randrange(i)]
+        tunnels[valve].add(other)
+        tunnels[other].add(valve)
+    for _ in range(len(valves) // 3):
+        a, b = rng.sample(valves, 2)
+        tunnels[a].add(b)
+        tunnels[b].add(a)
+    lines: list[str] = []
+    for valve in valves:
+        rate = 0 if valve == "AA" or rng.random() < 0.75 else rng.randint(2, 25)
+        connected = sorted(tunnels[valve])
+        if len(connected) == 1:
+            lines.append(f"Valve {valve} has flow rate={rate}; tunnel leads to valve {connected[0]}")
+        else:
+            lines.append(f"Valve {valve} has flow rate={rate}; tunnels lead to valves {', '.join(connected)}")
+    return "\n".join(lines)
+
+
+def generate_day17(size: int, rng: random.Random) -> str:
+    """size: length of the jet pattern"""
+    return "".join(rng.choice("<>") for _ in range(size))
+
+
+def generate_day18(size: int, rng: random.Random) -> str:
+    """size: number of cubes. They fill about half of a box, so there are air pockets"""
+    side = math.ceil((2 * size) ** (1 / 3)) + 1
+    cubes = rng.sample(
+        [(x, y, z) for x in range(1, side + 1) for y in range(1, side + 1) for z in range(1, side + 1)], size
+    )
+    return "\n".join(f"{x},{y},{z}" for x, y, z in cubes)
+
+
+def generate_day19(size: int, rng: random.Random) -> str:
+    """size: number of blueprints"""
+    lines: list[str] = []
+    for i in range(size):
+        lines.append(
+            f"Blueprint {i + 1}:"
+            f" Each ore robot costs {rng.randint(2, 4)} ore."
+            f" Each clay robot costs {rng.randint(2, 4)} ore."
+            f" Each obsidian robot costs {rng.randint(2, 4)} ore and {rng.randint(7, 20)} clay."
+            f" Each geode robot costs {rng.randint(2, 4)} ore and {rng.randint(7, 20)} obsidian."
+        )
+    return "\n".join(lines)
+
+
+def generate_day20(size: int, rng: random.Random) -> str:
+    """size: number of numbers. There's exactly one 0"""
+    numbers = [rng.choice([-1, 1]) * rng.randint(1, 10_000) for _ in range(max(size, 2) - 1)]
+    numbers.insert(rng.randint(0, len(numbers)), 0)
+    return "\n".join(str(n) for n in numbers)
+
+
+def generate_day21(size: int, rng: random.Random) -> str:
+    """
+    size: number of monkeys (approximately, since every operation joins 2 monkeys)
+    Part 2 always has an integer solution: humn only goes through +, -, and * by a constant,
+    and root's other side is adjusted to match a chosen value of humn.
+    """
+    used = {"root", "humn"}
+    num_leaves = max(size // 2, 2)
+    # Each node is (name, a, b), meaning that its value is a * humn + b
+    nodes = [(_name(rng, used), 0, rng.randint(1, 20)) for _ in range(num_leaves - 1)]
+    lines = [f"{name}: {b}" for name, _, b in nodes]
+    nodes.append(("humn", 1, 0))
+    lines.append(f"humn: {rng.randint(1, 20)}")
+    while len(nodes) > 2:
+        (n1, a1, b1), (n2, a2, b2) = (nodes.pop(rng.randrange(len(nodes))) for _ in range(2))
+        op = rng.choice("+-*/")
+        # Keep the numbers small, never divide by zero and never divide humn (so part 2 stays exact)
+        too_big = abs(a1 * b2) + abs(a2 * b1) + abs(b1 * b2) > 1_000_000
+        if op == "*" and (too_big or (a1 and not b2) or (a2 and not b1)):
+            op = "+"
+        if op == "/" and (a1 or a2 or b2 <= 0):
+            op = "-"
+        if op == "+":
+            a, b = a1 + a2, b1 + b2
+        elif op == "-":
+            a, b = a1 - a2, b1 - b2
+        elif op == "*":
+            a, b = a1 * b2 + a2 * b1, b1 * b2
+        else:
+            a, b = 0, b1 // b2
+        name = _name(rng, used)
+        lines.append(f"{name}: {n1} {op} {n2}")
+        nodes.append((name, a, b))
+    (humn_side, a, b), (other_side, _, other_value) = sorted(nodes, key=lambda node: node[1] == 0)
+    # Make both sides of root equal when humn is humn_value
+    humn_value = rng.randint(1, 10_000)
+    adjustment, adjusted_side = _name(rng, used), _name(rng, used)
+    lines.append(f"{adjustment}: {a * humn_value + b - other_value}")
+    lines.append(f"{adjusted_side}: {other_side} + {adjustment}")
+    lines.append(f"root: {humn_side} + {adjusted_side}")
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+def generate_day22(size: int, rng: random.Random) -> str:
+    """
+    size: number of moves in the path.
+    The map always has the 50x50 faces of the problem input, since the cube folding is hardcoded.
+    """
+    side = 50
+    faces_plan = [" AB", " C ", "DE ", "F  "]
+    lines: list[str] = []
+    for plan_row in faces_plan:
+        for _ in range(side):
+            line = ""
+            for face in plan_row.rstrip():
+                line += " " * side if face == " " else "".join("#" if rng.random() < 0.1 else "." for _ in range(side))
+            lines.append(line)
+    # The starting point is the leftmost open tile of the top row
+    lines[0] = lines[0][:side] + "." + lines[0][side + 1 :]
+    path = str(rng.randint(1, 50))
+    for _ in range(size):
+        path += rng.choice("LR") + str(rng.randint(1, 50))
+    return "\n".join(lines) + "\n\n" + path
+
+
+def generate_day23(size: int, rng: random.Random) -> str:
+    """
+    size: side of the square grove, half of it filled with elves. There's always at least 1 elf
+
+    >>> generate(23, 1, seed=1)
+    '#'
+    """
+    rows = [["#" if rng.random() < 0.5 else "." for _ in range(size)] for _ in range(size)]
+    rows[size // 2][size // 2] = "#"
+    return "\n".join("".join(row) for row in rows)
+
+
+def generate_day24(size: int, rng: random.Random) -> str:
+    """size: inner width of the valley. The height is a quarter of it"""
+    width = max(size, 3)
+    height = max(size // 4, 3)
+    lines = ["#." + "#" * width]
+    for _ in range(height):
+        line = "#"
+        for x in range(1, width + 1):
+            # Like in the problem input, there are no vertical blizzards in the entrance and exit columns
+            blizzards = "<>" if x in (1, width) else "<>^v"
+            line += rng.choice(blizzards) if rng.random() < 0.3 else "."
+        lines.append(line + "#")
+    lines.append("#" * width + ".#")
+    return "\n".join(lines)
+
+
+def generate_day25(size: int, rng: random.Random) -> str:
+    """size: number of SNAFU numbers"""
+    return "\n".join(day25.to_snafu(rng.randint(1, 10**12)) for _ in range(size))
+
+
+GENERATORS: dict[int, Generator] = {
+    1: generate_day01,
+    2: generate_day02,
+    3: generate_day03,
+    4: generate_day04,
+    5: generate_day05,
+    6: generate_day06,
+    7: generate_day07,
+    8: generate_day08,
+    9: generate_day09,
+    10: generate_day10,
+    11: generate_day11,
+    12: generate_day12,
+    13: generate_day13,
+    14: generate_day14,
+    15: generate_day15,
+    16: generate_day16,
+    17: generate_day17,
+    18: generate_day18,
+    19: generate_day19,
+    20: generate_day20,
+    21: generate_day21,
+    22: generate_day22,
+    23: generate_day23,
+    24: generate_day24,
+    25: generate_day25,
+}
+
+
+def generate(day: int, size: int, seed: int = DEFAULT_SEED) -> str:
+    """
+    Returns a synthetic input for the day. The same (day, size, seed) always gives the same input.
+
+    >>> print(generate(2, 3, seed=1))
+    A Z
+    A Y
+    A Y
+    >>> generate(20, 1000) == generate(20, 1000)
+    True
+    >>> generate(20, 1000).count("\\n") + 1
+    1000
+    """
+    return GENERATORS[day](size, random.Random(seed))
@@ -0,0 +1,82 @@
+"""
+Shortest paths in graphs where every edge costs 1, shared by the days that need them.
+A breadth-first search from every node gives all the shortest paths, without a priority queue.
+"""
+
+from collections import deque
+from typing import Generic, Hashable, Iterable, Mapping, TypeVar
+
+Node = TypeVar("Node", bound=Hashable)
+
+# The distance (and the parent) of the nodes that can't be reached. Check for it before using a distance in arithmetic
+UNREACHABLE = -1
+
+
+class DistanceMatrix(Generic[Node]):
+    """
+    The distances between all pairs of nodes, stored as a matrix of ints indexed by the position of each node.
+    The paths themselves are only built when asked for, from the parent of each node in each search.
+
+    >>> m = all_pairs_bfs({"AA": ["BB"], "BB": ["AA", "CC"], "CC": ["BB"], "DD": []})
+    >>> m.distance("AA", "CC"), m.distance("CC", "AA"), m.distance("AA", "DD")
+    (2, 2, -1)
+    >>> m.path("AA", "CC"), m.path("AA", "AA"), m.path("AA", "DD")
+    (['BB', 'CC'], [], None)
+    >>> m.submatrix(["CC", "AA"])
+    [[0, 2], [2, 0]]
+    """
+
+    def __init__(self, nodes: list[Node], distances: list[list[int]], parents: list[list[int]]) -> None:
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.distances = distances  # distances[i][j] goes from nodes[i] to nodes[j], or is UNREACHABLE
+        self.parents = parents  # parents[i][j] is the node before nodes[j] in the shortest path from nodes[i]
+
+    def distance(self, a: Node, b: Node) -> int:
+        return self.distances[self.index[a]][self.index[b]]
+
+    def path(self, a: Node, b: Node) -> list[Node] | None:
+        """Returns the nodes of a shortest path from a to b (without a), or None if b can't be reached"""
+        i, j = self.index[a], self.index[b]
+        if self.distances[i][j] == UNREACHABLE:
+            return None
+        path: list[Node] = []
+        while j != i:
+            path.append(self.nodes[j])
+            j = self.parents[i][j]
+        return path[::-1]
+
+    def submatrix(self, nodes: Iterable[Node]) -> list[list[int]]:
+        """The distances between the given nodes only, in the given order"""
+        indexes = [self.index[node] for node in nodes]
+        return [[self.distances[i][j] for j in indexes] for i in indexes]
+
+
+def all_pairs_bfs(connected_to: Mapping[Node, Iterable[Node]]) -> DistanceMatrix[Node]:
+    """
+    Runs a breadth-first search from every node of the graph.
+    connected_to must have every node as a key, even the ones without connections.
+
+    >>> all_pairs_bfs({1: [2], 2: [3], 3: [1]}).distances
+    [[0, 1, 2], [2, 0, 1], [1, 2, 0]]
+    """
+    nodes = list(connected_to)
+    index = {node: i for i, node in enumerate(nodes)}
+    neighbours = [[index[other] for other in connected_to[node]] for node in nodes]
+    distances: list[list[int]] = []
+    parents: list[list[int]] = []
+    for source in range(len(nodes)):
+        distance = [UNREACHABLE] * len(nodes)
+        parent = [UNREACHABLE] * len(nodes)
+        distance[source] = 0
+        queue = deque([source])
+        while queue:
+            i = queue.popleft()
+            for j in neighbours[i]:
+                if distance[j] == UNREACHABLE:
+                    distance[j] = distance[i] + 1
+                    parent[j] = i
+                    queue.append(j)
+        distances.append(distance)
+        parents.append(parent)
+    return DistanceMatrix(nodes, distances, parents)
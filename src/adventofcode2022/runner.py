@@ -0,0 +1,442 @@
+"""
+Runs and benchmarks the solutions of every day from a single entry point:
+
+    python -m adventofcode2022 --days 1 12 20 --repeat 5 --json bench.json
+
+With --save the timings are appended to a history file, and with --compare the run fails
+if any part got slower than --threshold times its stored baseline.
+With --generate the days run on synthetic inputs of the given size (see generators.py).
+With --engine the days that have alternative implementations in ENGINES run with the given one.
+
+Each day registers its parts in SOLVERS. A solver receives the raw input text and returns the answer.
+"""
+
+import argparse
+from contextlib import redirect_stdout
+import hashlib
+import io
+import json
+import math
+from pathlib import Path
+import statistics
+import sys
+from timeit import default_timer as timer
+from typing import Any, Callable
+
+import benchmark_history
+from commonlib import parse_blocks_of_int
+import generators
+import day02
+import day02_2
+import day03
+import day04
+import day05
+import day06
+import day07
+import day08
+import day09
+import day10
+import day11
+import day12
+import day13
+import day14
+import day15
+import day16
+import day17
+import day18
+import day19
+import day20
+import day21
+import day22
+import day23
+import day24
+import day25
+
+Solver = Callable[[str], Any]
+
+PACKAGE_DIR = Path(__file__).parent
+DEFAULT_INPUT = "input"  # Reads dayXX_input.txt. Use "input_ex" for the examples
+DEFAULT_REPEAT = 1
+
+
+def _lines(text: str) -> list[str]:
+    return text.rstrip().split("\n")
+
+
+def _day01(text: str, top: int) -> int:
+    sum_inventories = [sum(inventory) for inventory in parse_blocks_of_int(text)]
+    return sum(sorted(sum_inventories, reverse=True)[0:top])
+
+
+def _day05(text: str, all_at_once: bool) -> str:
+    stacks_txt, instructions_txt = text.split("\n\n")
+    stacks_lines = [line.rstrip() for line in stacks_txt.split("\n") if line]
+    instructions_lines = [line.rstrip() for line in instructions_txt.split("\n") if line]
+    stacks = day05.move_crates(day05.read_stacks(stacks_lines), instructions_lines, all_at_once)
+    return "".join([v[-1] for v in stacks.values()])
+
+
+def _day07(text: str, part: int) -> int:
+    tree = day07.build_tree(day07.parse_input(text.rstrip()))
+    day07.update_directory_sizes(tree)
+    if part == 1:
+        return day07.sum_node_sizes(day07.directories_with_given_size(tree, day07.MAX_DIR_SIZE, size_below=True))
+    free_space_required = day07.UPDATE_SIZE - (day07.DISK_SIZE - tree.size)
+    directories = day07.directories_with_given_size(tree, free_space_required, size_below=False)
+    return day07.smallest_sized_node(directories).size
+
+
+def _day09(text: str) -> list[day09.Instruction]:
+    return [(words[0], int(words[1])) for words in (line.split(" ") for line in _lines(text))]
+
+
+def _day10(text: str, part: int) -> int | str:
+    history_X, crt = day10.main([line.split(" ") for line in _lines(text)])
+    if part == 1:
+        return day10.sum_of_signal_strengths(history_X)
+    return "\n".join(crt[i : i + day10.CRT_WIDTH] for i in range(0, len(crt), day10.CRT_WIDTH))
+
+
+def _day11(text: str, part: int) -> int:
+    monkeys = day11.process_input([line.strip() for line in _lines(text)])
+    inspected = day11.part_1(monkeys) if part == 1 else day11.part_2(monkeys)
+    return day11.monkey_business(inspected)
+
+
+def _day14(text: str, part: int, engine: str = "grid") -> int:
+    rock_lines = day14.parse_rock_lines(_lines(text))
+    if part == 2 and engine == "rows":
+        return day14.count_sand_2_rows(rock_lines, day14.HOLE)
+    return day14.drop_sand_grid(rock_lines, day14.HOLE, with_floor=part == 2)
+
+
+def _day15(text: str, part: int) -> int:
+    closest_pairs = day15.parse_closest_pairs(_lines(text))
+    # The example uses a smaller search area than the problem input
+    is_example = max(sensor.x for sensor, _ in closest_pairs) <= day15.DEMO_MAX_XY
+    if part == 1:
+        y = day15.DEMO_Y_LINE if is_example else day15.PART1_Y_LINE
+        return day15.count_no_beacon_points_intervals(closest_pairs, y)
+    p = min(day15.find_uncovered_points(closest_pairs, day15.DEMO_MAX_XY if is_example else day15.MAX_XY))
+    return day15.TUNING_FACTOR * p.x + p.y
+
+
+def _day16(text: str, part: int) -> int:
+    day16.load_valves(_lines(text))
+    graph = day16.compress_graph()
+    if part == 1:
+        return max(day16.best_pressure_per_subset(graph, day16.TOTAL_MINUTES_PART1).values())
+    return day16.best_pressure_two_players(graph, day16.TOTAL_MINUTES_PART2)
+
+
+def _day17(text: str, part: int) -> int:
+    if part == 1:
+        return day17.tower_height(text.rstrip(), day17.NUM_PIECES_1)
+    return day17.tower_height_with_cycles(text.rstrip(), day17.NUM_PIECES_2)
+
+
+def _day18(text: str, part: int) -> int:
+    cubes = [day18.P(*map(int, line.split(","))) for line in _lines(text)]
+    return day18.part1(cubes) if part == 1 else day18.part2(cubes)
+
+
+def _day19(text: str, part: int, max_workers: int | None = 1) -> int:
+    blueprints = day19.get_blueprints(_lines(text))
+    if part == 1:
+        minutes = day19.TOTAL_MINUTES_PART1
+    else:
+        minutes = day19.TOTAL_MINUTES_PART2
+        blueprints = blueprints[: day19.NUM_BLUEPRINTS_PART2]
+    results = [result for result, _ in day19.solve_blueprints(blueprints, minutes, max_workers)]
+    return day19.sum_quality_levels(results) if part == 1 else day19.multiply_results(results)
+
+
+def _day20(text: str, part: int, engine: str = day20.DEFAULT_MIX_ENGINE) -> int:
+    array = [int(line) for line in _lines(text)]
+    mix_array = day20.MIX_ENGINES[engine]
+    if part == 1:
+        return day20.sum_grove_coordinates(mix_array(array, 1))
+    array = [v * day20.DECRYPTION_KEY for v in array]
+    return day20.sum_grove_coordinates(mix_array(array, day20.NUM_ROUNDS_PART_2))
+
+
+def _day20_engine(engine: str) -> dict[int, Solver]:
+    return {1: lambda text: _day20(text, 1, engine), 2: lambda text: _day20(text, 2, engine)}
+
+
+def _day22(text: str, part: int) -> int:
+    map_txt, instructions = text.rstrip().split("\n\n")
+    map_lines = map_txt.split("\n")
+    # The cube folding is hardcoded for the example and for the problem input
+    is_example = len(map_lines) < 50
+    p, facing = day22.navigate(map_lines, instructions, wrap_cube=part == 2, example=is_example)
+    return day22.final_password(p, facing)
+
+
+def _day23(text: str, part: int, engine: str = "set") -> int:
+    if engine == "numpy":
+        if part == 1:
+            return day23.simulate_numpy(_lines(text), day23.NUM_ROUNDS_PART1)[0]
+        return day23.simulate_numpy(_lines(text))[1]
+    if part == 1:
+        return day23.empty_squares_after(_lines(text), day23.NUM_ROUNDS_PART1)
+    return day23.simulate_set(_lines(text))[1]
+
+
+SOLVERS: dict[int, dict[int, Solver]] = {
+    1: {1: lambda text: _day01(text, 1), 2: lambda text: _day01(text, 3)},
+    2: {
+        1: lambda text: day02.calculate_points_from_rounds([line.split(" ") for line in _lines(text)]),
+        2: lambda text: day02_2.calculate_points_from_rounds([line.split(" ") for line in _lines(text)]),
+    },
+    3: {
+        1: lambda text: day03.priority_of_duplicate_items_in_rucksack(_lines(text)),
+        2: lambda text: day03.priority_of_group_badges_in_rucksack(_lines(text)),
+    },
+    4: {
+        1: lambda text: day04.count_completely_overlapped_pairs_in_range(_lines(text)),
+        2: lambda text: day04.count_overlapping_pairs_in_range(_lines(text)),
+    },
+    5: {1: lambda text: _day05(text, False), 2: lambda text: _day05(text, True)},
+    6: {
+        1: lambda text: day06.index_after_marker(text, day06.BUFFER_SIZE_START_OF_PACKET),
+        2: lambda text: day06.index_after_marker(text, day06.BUFFER_SIZE_START_OF_MESSAGE),
+    },
+    7: {1: lambda text: _day07(text, 1), 2: lambda text: _day07(text, 2)},
+    8: {
+        1: lambda text: day08.num_visible_trees(day08.make_matrix(_lines(text))),
+        2: lambda text: day08.max_scenic_score(day08.make_matrix(_lines(text))),
+    },
+    9: {1: lambda text: day09.part1(_day09(text)), 2: lambda text: day09.part2(_day09(text))},
+    10: {1: lambda text: _day10(text, 1), 2: lambda text: _day10(text, 2)},
+    11: {1: lambda text: _day11(text, 1), 2: lambda text: _day11(text, 2)},
+    12: {
+        1: lambda text: day12.best_path_length_bfs(_lines(text), part_1=True),
+        2: lambda text: day12.best_path_length_bfs(_lines(text), part_1=False),
+    },
+    13: {
+        1: lambda text: day13.sum_right_order_indexes(text.rstrip().split("\n\n")),
+        2: lambda text: day13.decoder_key(text.rstrip().split("\n\n")),
+    },
+    14: {1: lambda text: _day14(text, 1), 2: lambda text: _day14(text, 2)},
+    15: {1: lambda text: _day15(text, 1), 2: lambda text: _day15(text, 2)},
+    16: {1: lambda text: _day16(text, 1), 2: lambda text: _day16(text, 2)},
+    17: {1: lambda text: _day17(text, 1), 2: lambda text: _day17(text, 2)},
+    18: {1: lambda text: _day18(text, 1), 2: lambda text: _day18(text, 2)},
+    19: {1: lambda text: _day19(text, 1), 2: lambda text: _day19(text, 2)},
+    20: {1: lambda text: _day20(text, 1), 2: lambda text: _day20(text, 2)},
+    21: {1: lambda text: day21.part1(_lines(text)), 2: lambda text: day21.part2(_lines(text))},
+    22: {1: lambda text: _day22(text, 1), 2: lambda text: _day22(text, 2)},
+    23: {1: lambda text: _day23(text, 1), 2: lambda text: _day23(text, 2)},
+    24: {
+        1: lambda text: day24.simulate_bitset(_lines(text), part=1),
+        2: lambda text: day24.simulate_bitset(_lines(text), part=2),
+    },
+    25: {1: lambda text: day25.to_snafu(day25.part1(_lines(text)))},
+}
+
+
+# Alternative implementations of some days, selected with --engine. They replace the parts in SOLVERS
+ENGINES: dict[int, dict[str, dict[int, Solver]]] = {
+    14: {"rows": {1: lambda text: _day14(text, 1, "rows"), 2: lambda text: _day14(text, 2, "rows")}},
+    19: {"processes": {1: lambda text: _day19(text, 1, None), 2: lambda text: _day19(text, 2, None)}},
+    20: {engine: _day20_engine(engine) for engine in day20.MIX_ENGINES},
+    23: {"numpy": {1: lambda text: _day23(text, 1, "numpy"), 2: lambda text: _day23(text, 2, "numpy")}},
+    24: {
+        "frontier": {
+            1: lambda text: day24.simulate_frontier(_lines(text), part=1),
+            2: lambda text: day24.simulate_frontier(_lines(text), part=2),
+        }
+    },
+}
+
+
+def engine_names() -> list[str]:
+    """
+    >>> engine_names()
+    ['blocklist', 'circular_list', 'frontier', 'numpy', 'processes', 'rows']
+    """
+    return sorted({engine for engines in ENGINES.values() for engine in engines})
+
+
+def input_file(day: int, input_name: str = DEFAULT_INPUT) -> Path:
+    """
+    >>> input_file(7).name
+    'day07_input.txt'
+    >>> input_file(10, "input_ex").name
+    'day10_input_ex.txt'
+    """
+    return PACKAGE_DIR / f"day{day:02d}_{input_name}.txt"
+
+
+def input_hash(text: str) -> str:
+    """
+    Short fingerprint of an input, so that timings of different inputs are never compared
+
+    >>> input_hash("1\\n2\\n3")
+    'ad53e8806d17'
+    """
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def percentile(timings: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of the timings
+
+    >>> percentile([5.0, 1.0, 3.0, 2.0, 4.0], 0.95)
+    5.0
+    >>> percentile([5.0, 1.0, 3.0, 2.0, 4.0], 0.5)
+    3.0
+    """
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def benchmark(solver: Solver, text: str, repeat: int = DEFAULT_REPEAT) -> dict[str, Any]:
+    """
+    Runs the solver repeat times and returns its answer and the wall-clock statistics (in seconds).
+    Whatever the solver prints is discarded.
+
+    >>> result = benchmark(SOLVERS[1][1], "1\\n2\\n\\n4", repeat=3)
+    >>> result["answer"], result["repeat"], result["min"] <= result["median"] <= result["p95"]
+    (4, 3, True)
+    """
+    timings: list[float] = []
+    answer: Any = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = timer()
+            answer = solver(text)
+            timings.append(timer() - start)
+    return {
+        "answer": answer,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "p95": percentile(timings, 0.95),
+    }
+
+
+def run(
+    days: list[int],
+    parts: list[int],
+    input_name: str = DEFAULT_INPUT,
+    repeat: int = DEFAULT_REPEAT,
+    generate_size: int | None = None,
+    seed: int = generators.DEFAULT_SEED,
+    engine: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Benchmarks the selected days and parts, returning one record per (day, part).
+    If generate_size is given, the days run on synthetic inputs of that size instead of the input files.
+    If engine is given, the days that have it in ENGINES run with it, and their records are tagged with it.
+    If a part fails, it's reported, its record holds the error instead of the timings, and the other parts still run.
+    """
+    records: list[dict[str, Any]] = []
+    for day in days:
+        if generate_size is not None:
+            name = f"generated-{generate_size}-seed{seed}"
+            text = generators.generate(day, generate_size, seed)
+        else:
+            name = input_name
+            file_input = input_file(day, input_name)
+            if not file_input.exists():
+                print(f"Day {day:02d}: skipped, {file_input.name} not found", file=sys.stderr)
+                continue
+            text = file_input.read_text()
+        solvers = SOLVERS[day]
+        tags: dict[str, Any] = {}
+        if engine is not None and engine in ENGINES.get(day, {}):
+            solvers = ENGINES[day][engine]
+            tags["engine"] = engine
+        for part, solver in solvers.items():
+            if part not in parts:
+                continue
+            record = {"day": day, "part": part, "input": name, "input_hash": input_hash(text), **tags}
+            try:
+                record.update(benchmark(solver, text, repeat))
+            except Exception as e:
+                # A failing solver (e.g. on a generated input it can't handle) doesn't stop the other parts
+                record["error"] = f"{type(e).__name__}: {e}"
+                print(f"Day {day:02d} Part {part}: failed, {record['error']}", file=sys.stderr)
+            else:
+                print(format_record(record), file=sys.stderr)
+            records.append(record)
+    return records
+
+
+def format_record(record: dict[str, Any]) -> str:
+    """
+    >>> print(format_record({"day": 6, "part": 1, "min": 0.0012, "median": 0.0015, "p95": 0.002, "answer": 7}))
+    Day 06 Part 1:  min 0.001200 s | median 0.001500 s | p95 0.002000 s | 7
+    """
+    answer = str(record["answer"])
+    separator = " |\n" if "\n" in answer else " | "
+    return (
+        f"Day {record['day']:02d} Part {record['part']}: "
+        f" min {record['min']:.6f} s | median {record['median']:.6f} s | p95 {record['p95']:.6f} s{separator}{answer}"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m adventofcode2022", description="Runs and benchmarks the solutions")
+    parser.add_argument("--days", type=int, nargs="+", default=sorted(SOLVERS), help="days to run (default: all)")
+    parser.add_argument("--parts", type=int, nargs="+", default=[1, 2], help="parts to run (default: 1 2)")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="input file suffix, e.g. input_ex (default: input)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="repetitions per part (default: 1)")
+    parser.add_argument("--generate", metavar="SIZE", type=int, help="run on synthetic inputs of the given size")
+    parser.add_argument(
+        "--seed", type=int, default=generators.DEFAULT_SEED, help="seed of the synthetic inputs (default: 0)"
+    )
+    parser.add_argument(
+        "--engine", choices=engine_names(), help="alternative implementation, for the days that have it in ENGINES"
+    )
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON to FILE ('-' for stdout)")
+    parser.add_argument(
+        "--history",
+        default=benchmark_history.DEFAULT_HISTORY_FILE,
+        help=f"benchmark history file (default: {benchmark_history.DEFAULT_HISTORY_FILE})",
+    )
+    parser.add_argument("--save", action="store_true", help="append the results to the history file")
+    parser.add_argument("--compare", action="store_true", help="fail if slower than the baselines in the history")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=benchmark_history.DEFAULT_THRESHOLD,
+        help=f"slowdown ratio that counts as a regression (default: {benchmark_history.DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=benchmark_history.METRICS,
+        default=benchmark_history.DEFAULT_METRIC,
+        help=f"timing compared against the baselines (default: {benchmark_history.DEFAULT_METRIC})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    unknown_days = [day for day in args.days if day not in SOLVERS]
+    if unknown_days:
+        raise SystemExit(f"Unknown days: {unknown_days}")
+    records = run(args.days, args.parts, args.input, args.repeat, args.generate, args.seed, args.engine)
+    if args.json == "-":
+        print(json.dumps(records, indent=2, default=str))
+    elif args.json:
+        Path(args.json).write_text(json.dumps(records, indent=2, default=str) + "\n")
+    # Compare before saving, so that this run is never its own baseline
+    regressions: list[str] = []
+    if args.compare:
+        baselines = benchmark_history.load_baselines(args.history)
+        regressions = benchmark_history.find_regressions(
+            records, baselines, args.threshold, args.metric, parts=args.parts
+        )
+    if args.save:
+        benchmark_history.append_records(args.history, records)
+    if regressions:
+        print("Regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"- {regression}", file=sys.stderr)
+        raise SystemExit(1)
+    if any("error" in record for record in records):
+        raise SystemExit(1)